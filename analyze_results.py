@@ -1,55 +1,329 @@
 #!/usr/bin/env python3
 """
 Analyze and visualize experiment results
+
+pandas is imported inside the functions that build tables, so the log
+parsing helpers stay cheap to import (ingestion workers, other CLIs) and the
+early exits don't pay for it.
 """
+import argparse
+import bisect
 import json
 import os
 import re
 from pathlib import Path
-import pandas as pd
-
-def parse_log_file(log_file):
-    """Extract metrics from a log file"""
-    with open(log_file, 'r') as f:
-        content = f.read()
 
+from factorial_design import estimate_effects, load_design, tensor_effects
+from log_archive import ArchivedLog, list_logs
+from log_parser import new_state, parse_lines, parse_log, parse_stream, preferred_source, summarize_log
+from results_store import PARETO_COSTS, RESULTS_DB, upsert_results
+
+# base_config learning rate in generate_experiments.py
+DEFAULT_LEARNING_RATE = 1e-3
+
+# Two-level sweep axes used for effect estimation
+FACTORS = ['block_size', 'n_layer', 'n_head', 'n_embd', 'batch_size', 'max_iters', 'dropout']
+
+PARSE_CACHE_FILE = 'experiments/.log_parse_cache.json'
+PARSE_CACHE_VERSION = 4
+
+# Bytes of the log head used to detect a log rewritten in place
+HEAD_BYTES = 128
+
+# Below this many logs to parse, a process pool costs more than it saves
+MIN_PARALLEL_LOGS = 64
+
+# Iterations excluded from throughput as warm-up (nanoGPT's own MFU estimate starts after 5)
+WARMUP_ITERS = 5
+
+# Peak FLOP/s that nanoGPT's estimate_mfu() measures against (A100 bf16)
+PEAK_FLOPS = 312e12
+
+# An iteration is an outlier above median + OUTLIER_MADS * scaled MAD of the
+# steady-state times (and at least OUTLIER_MIN_RATIO times the median)
+OUTLIER_MADS = 5
+OUTLIER_MIN_RATIO = 1.25
+
+# Causes an outlier iteration is attributed to, in order of precedence
+OUTLIER_CAUSES = ['first_iter', 'warmup', 'checkpoint', 'eval', 'unexplained']
+
+def steady_state_times(state):
+    """Per-iteration times (ms) excluding warm-up iterations and iterations that ran an eval"""
+    eval_steps = set(state['eval_steps'])
+
+    # Warm-up iterations and the ones that follow an eval include extra work
+    return [t for i, (it, t) in enumerate(zip(state['iterations'], state['iter_times']))
+            if i >= WARMUP_ITERS and it not in eval_steps and t is not None]
+
+def percentile(sorted_values, q):
+    """Linearly interpolated percentile (0-100) of an already sorted list"""
+    pos = (len(sorted_values) - 1) * q / 100
+    lo = int(pos)
+    hi = min(lo + 1, len(sorted_values) - 1)
+    return sorted_values[lo] + (sorted_values[hi] - sorted_values[lo]) * (pos - lo)
+
+def latency_stats(state):
+    """Iteration-latency distribution and attributed outlier iterations
+
+    Percentiles and the coefficient of variation describe the steady-state
+    times. Every iteration (warm-up and eval ones included) is then checked
+    against a robust threshold, and each outlier is attributed to the first
+    iteration, warm-up, a checkpoint save, an eval, or left unexplained
+    (interference from the host).
+    """
+    stats = {'iter_p50': None, 'iter_p90': None, 'iter_p99': None, 'iter_cv': None, 'iter_outliers': []}
+    stats.update({f'outliers_{cause}': 0 for cause in OUTLIER_CAUSES})
+
+    times = sorted(steady_state_times(state))
+    if len(times) < 2:
+        return stats
+
+    median = percentile(times, 50)
+    mean = sum(times) / len(times)
+    std = (sum((t - mean) ** 2 for t in times) / (len(times) - 1)) ** 0.5
+    mad = percentile(sorted(abs(t - median) for t in times), 50) * 1.4826
+    threshold = max(median + OUTLIER_MADS * mad, median * OUTLIER_MIN_RATIO)
+
+    stats.update({
+        'iter_p50': median,
+        'iter_p90': percentile(times, 90),
+        'iter_p99': percentile(times, 99),
+        'iter_cv': std / mean
+    })
+
+    eval_steps = set(state['eval_steps'])
+    checkpoint_steps = set(state['checkpoint_steps'])
+    for i, (it, t) in enumerate(zip(state['iterations'], state['iter_times'])):
+        if t is None or t <= threshold:
+            continue
+        if i == 0:
+            cause = 'first_iter'
+        elif i < WARMUP_ITERS:
+            cause = 'warmup'
+        elif it in checkpoint_steps:
+            cause = 'checkpoint'
+        elif it in eval_steps:
+            cause = 'eval'
+        else:
+            cause = 'unexplained'
+        stats['iter_outliers'].append({'iter': it, 'time_ms': t, 'ratio': t / median, 'cause': cause})
+        stats[f'outliers_{cause}'] += 1
+
+    return stats
+
+def finalize_metrics(state):
+    """Turn parser state into the metrics dict"""
     metrics = {
-        'train_losses': [],
-        'val_losses': [],
-        'iter_times': [],
+        'train_losses': list(state['train_losses']),
+        'val_losses': list(state['val_losses']),
+        'iter_times': list(state['iter_times']),
         'final_train_loss': None,
         'final_val_loss': None,
-        'duration': None,
-        'num_parameters': None
+        'duration': state['duration'],
+        'cpu_seconds': state['cpu_seconds'],
+        'num_parameters': state['num_parameters'],
+        'iter_ms': None
     }
 
-    # Extract number of parameters
-    param_match = re.search(r'number of parameters: ([\d.]+)M', content)
-    if param_match:
-        metrics['num_parameters'] = float(param_match.group(1))
+    # Mean steady-state iteration time
+    times = steady_state_times(state)
+    if times:
+        metrics['iter_ms'] = sum(times) / len(times)
 
-    # Extract step losses (validation)
-    step_matches = re.findall(r'step \d+: train loss ([\d.]+), val loss ([\d.]+)', content)
-    for train_loss, val_loss in step_matches:
-        metrics['train_losses'].append(float(train_loss))
-        metrics['val_losses'].append(float(val_loss))
+    metrics.update(latency_stats(state))
 
     # Get final losses
     if metrics['train_losses']:
         metrics['final_train_loss'] = metrics['train_losses'][-1]
         metrics['final_val_loss'] = metrics['val_losses'][-1]
 
-    # Extract duration
-    duration_match = re.search(r'Duration: ([\d.]+) seconds', content)
-    if duration_match:
-        metrics['duration'] = float(duration_match.group(1))
+    return metrics
+
+def parse_log_file(log_file):
+    """Extract metrics from a log file"""
+    return finalize_metrics(parse_log(log_file))
+
+def parse_tail(f, offset, state):
+    """Copy of state with the unterminated bytes from offset to EOF parsed in"""
+    state = json.loads(json.dumps(state))
+    f.seek(offset)
+    parse_lines([f.read().decode('utf-8', errors='replace')], state)
+    return state
+
+def parse_log_job(job):
+    """Parse one log from a cursor; runs in ingestion worker processes
+
+    job holds the log path and, for a log seen before, its inode, head,
+    offset and parser state. The state is reused only if the log is the
+    same file and has grown; otherwise the log is parsed from the start.
+    """
+    log_file = job['path']
+
+    # Archived logs are complete and immutable: parse the frame once
+    if isinstance(log_file, ArchivedLog):
+        state = parse_log(log_file)
+        entry = {'archive': [log_file.offset, log_file.length], 'state': state}
+        return str(log_file), entry, finalize_metrics(state)
+
+    st = os.stat(log_file)
+
+    with open(log_file, 'rb') as f:
+        head = f.read(HEAD_BYTES).decode('utf-8', errors='replace')
+
+        appended = (job.get('state') is not None and job['inode'] == st.st_ino
+                    and st.st_size >= job['offset'] and head.startswith(job['head']))
+        if appended:
+            state, offset = job['state'], job['offset']
+        else:
+            state, offset = new_state(), 0
+
+        f.seek(offset)
+        offset += parse_stream(f, state)
+
+        entry = {
+            'inode': st.st_ino,
+            'size': st.st_size,
+            'mtime': st.st_mtime,
+            'offset': offset,
+            'head': head,
+            'state': state
+        }
+
+        # A final unterminated line counts for this run but stays uncommitted
+        if offset < st.st_size:
+            state = parse_tail(f, offset, state)
+
+    return str(log_file), entry, finalize_metrics(state)
+
+class LogParseCache:
+    """Persisted per-log parser state and byte-offset cursors
+
+    Unchanged logs (same inode, size and mtime) are not opened at all,
+    apart from re-reading a final line that has no newline yet; logs
+    that have grown are parsed from the saved offset only; anything else
+    (truncated, replaced or rewritten) is parsed from the start. Archived
+    logs are keyed by their frame's offset and length.
+    """
+
+    def __init__(self, path=PARSE_CACHE_FILE):
+        self.path = path
+        self.entries = {}
+        self.dirty = False
+        if os.path.exists(path):
+            try:
+                with open(path, 'r') as f:
+                    cached = json.load(f)
+                # Parser state from another cache version cannot be resumed
+                if cached.get('version') == PARSE_CACHE_VERSION:
+                    self.entries = cached['entries']
+            except (OSError, ValueError, AttributeError):
+                self.entries = {}
+
+    def plan(self, log_file):
+        """Return (metrics, None) for an unchanged log, else (None, parse job)"""
+        key = str(log_file)
+        entry = self.entries.get(key)
+
+        if isinstance(log_file, ArchivedLog):
+            if entry and entry.get('archive') == [log_file.offset, log_file.length]:
+                return finalize_metrics(entry['state']), None
+            return None, {'path': log_file}
+
+        st = os.stat(log_file)
+        if entry and 'inode' in entry and entry['inode'] == st.st_ino and entry['size'] == st.st_size \
+                and entry['mtime'] == st.st_mtime:
+            state = entry['state']
+            # The stored state stops before a final unterminated line
+            if entry['offset'] < entry['size']:
+                with open(log_file, 'rb') as f:
+                    state = parse_tail(f, entry['offset'], state)
+            return finalize_metrics(state), None
+
+        job = {'path': log_file}
+        if entry and 'inode' in entry:
+            job.update({k: entry[k] for k in ('inode', 'offset', 'head', 'state')})
+        return None, job
+
+    def update(self, key, entry):
+        """Store the cursor and state returned by parse_log_job"""
+        self.entries[key] = entry
+        self.dirty = True
+
+    def metrics(self, log_file):
+        """Return metrics for a log, parsing only what changed since last time"""
+        metrics, job = self.plan(log_file)
+        if job is None:
+            return metrics
+        key, entry, metrics = parse_log_job(job)
+        self.update(key, entry)
+        return metrics
+
+    def prune(self, keep):
+        """Drop entries for logs that no longer exist"""
+        keep = {str(k) for k in keep}
+        for key in list(self.entries):
+            if key not in keep:
+                del self.entries[key]
+                self.dirty = True
+
+    def save(self):
+        """Write the cache back if anything changed"""
+        if not self.dirty:
+            return
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': PARSE_CACHE_VERSION, 'entries': self.entries}, f)
+        os.replace(tmp_path, self.path)
+        self.dirty = False
+
+def ingest_logs(log_files, cache=None, workers=None, chunksize=None):
+    """Parse many logs, fanning out over a process pool; returns metrics in input order
+
+    Cache hits are resolved in this process. The remaining logs are parsed
+    serially when there are few of them (pool startup would dominate) and
+    otherwise in chunks across worker processes.
+    """
+    metrics = [None] * len(log_files)
+    jobs = []
+
+    for idx, log_file in enumerate(log_files):
+        if cache is not None:
+            hit, job = cache.plan(log_file)
+            if job is None:
+                metrics[idx] = hit
+                continue
+        else:
+            job = {'path': log_file}
+        jobs.append((idx, job))
+
+    workers = workers or os.cpu_count() or 1
+    if workers > 1 and len(jobs) >= MIN_PARALLEL_LOGS:
+        from concurrent.futures import ProcessPoolExecutor
+
+        chunksize = chunksize or max(1, len(jobs) // (workers * 4))
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            parsed = list(pool.map(parse_log_job, [job for _, job in jobs], chunksize=chunksize))
+    else:
+        parsed = [parse_log_job(job) for _, job in jobs]
+
+    for (idx, _), (key, entry, result) in zip(jobs, parsed):
+        metrics[idx] = result
+        if cache is not None:
+            cache.update(key, entry)
 
     return metrics
 
+def summarize_log_file(log_file):
+    """Final metrics from the head and tail of a log, falling back to a full parse"""
+    state = summarize_log(log_file)
+    if state is None:
+        return parse_log_file(log_file)
+    return finalize_metrics(state)
+
 def parse_config_name(exp_name):
     """Parse experiment name to extract hyperparameters"""
-    # exp_001_bs64_nl4_nh4_ne128_bsz8_mi25_dr0.1
-    pattern = r'exp_(\d+)_bs(\d+)_nl(\d+)_nh(\d+)_ne(\d+)_bsz(\d+)_mi(\d+)_dr([\d.]+)'
+    # exp_001_bs64_nl4_nh4_ne128_bsz8_mi25_dr0.1 (refined sweeps append _lr0.0007)
+    pattern = r'exp_(\d+)_bs(\d+)_nl(\d+)_nh(\d+)_ne(\d+)_bsz(\d+)_mi(\d+)_dr([\d.]+?)(?:_lr([\d.e-]+))?$'
     match = re.match(pattern, exp_name)
 
     if match:
@@ -61,22 +335,116 @@ def parse_config_name(exp_name):
             'n_embd': int(match.group(5)),
             'batch_size': int(match.group(6)),
             'max_iters': int(match.group(7)),
-            'dropout': float(match.group(8))
+            'dropout': float(match.group(8)),
+            'learning_rate': float(match.group(9)) if match.group(9) else DEFAULT_LEARNING_RATE
         }
     return {}
 
-def analyze_experiments():
-    """Analyze all experiment results"""
+def steady_state_iter_times(log_file):
+    """Return steady-state per-iteration times (ms) of a log"""
+    return steady_state_times(parse_log(log_file))
+
+def compile_comparison(members=None, results=None):
+    """Compare eager vs compiled tokens/sec for each compiled-graph shape
+
+    Only members with compiled logs are looked at. Eager iteration times
+    come from results (as returned by analyze_experiments) when given, and
+    otherwise from the log parse cache, so eager logs are not parsed again.
+    """
+
+    compiled_logs = {}
+    for member in members or ['member1', 'member2', 'member3', 'member4']:
+        log_dir = f'experiments/{member}/logs_compiled'
+        if os.path.exists(log_dir):
+            compiled_logs[member] = list_logs(log_dir)
+
+    if not any(compiled_logs.values()):
+        return []
+
+    shapes = {}
+
+    def add(mode, exp_name, iter_ms):
+        config = parse_config_name(exp_name)
+        if not config or not iter_ms:
+            return
+        tokens_per_iter = config['batch_size'] * config['block_size']
+        shape = (config['n_layer'], config['n_head'], config['n_embd'],
+                 config['block_size'], config['batch_size'])
+        shapes.setdefault(shape, {}).setdefault(mode, []).append(tokens_per_iter / iter_ms * 1000)
+
+    for member, log_files in compiled_logs.items():
+        for log_file in log_files:
+            times = steady_state_iter_times(log_file)
+            add('compiled', log_file.stem, sum(times) / len(times) if times else None)
+
+    if results is not None:
+        for r in results:
+            if r['member'] in compiled_logs:
+                add('eager', r['exp_name'], r['iter_ms'])
+    else:
+        cache = LogParseCache()
+        for member in compiled_logs:
+            log_dir = f'experiments/{member}/logs'
+            if not os.path.exists(log_dir):
+                continue
+            for log_file in list_logs(log_dir):
+                add('eager', log_file.stem, cache.metrics(preferred_source(log_file))['iter_ms'])
+        cache.save()
 
-    results = []
+    rows = []
+    for shape, modes in sorted(shapes.items()):
+        if 'compiled' not in modes:
+            continue
+        eager = sum(modes['eager']) / len(modes['eager']) if 'eager' in modes else None
+        compiled = sum(modes['compiled']) / len(modes['compiled'])
+        rows.append({
+            'n_layer': shape[0], 'n_head': shape[1], 'n_embd': shape[2],
+            'block_size': shape[3], 'batch_size': shape[4],
+            'eager_tokens_per_sec': eager,
+            'compiled_tokens_per_sec': compiled,
+            'speedup': compiled / eager if eager else None
+        })
+
+    return rows
+
+def print_compile_comparison(members=None, results=None):
+    """Print the eager vs compiled throughput table"""
+
+    rows = compile_comparison(members, results)
+    if not rows:
+        return
 
-    for member in ['member1', 'member2', 'member3', 'member4']:
+    print("\n" + "-"*80)
+    print("COMPILED VS EAGER THROUGHPUT (steady-state tokens/sec):")
+    print("-"*80)
+    print(f"{'n_layer':>7} {'n_head':>6} {'n_embd':>6} {'block':>5} {'batch':>5} "
+          f"{'eager':>10} {'compiled':>10} {'speedup':>8}")
+    for r in rows:
+        eager = f"{r['eager_tokens_per_sec']:.0f}" if r['eager_tokens_per_sec'] else '-'
+        speedup = f"{r['speedup']:.2f}x" if r['speedup'] else '-'
+        print(f"{r['n_layer']:>7} {r['n_head']:>6} {r['n_embd']:>6} {r['block_size']:>5} "
+              f"{r['batch_size']:>5} {eager:>10} {r['compiled_tokens_per_sec']:>10.0f} {speedup:>8}")
+
+def discover_members():
+    """Member and refinement-round directories that have logs, in sorted order"""
+    return sorted(p.parent.name for p in Path('experiments').glob('*/logs') if p.is_dir())
+
+def analyze_experiments(use_cache=True, workers=None, summary=False):
+    """Analyze all experiment results
+
+    With use_cache, per-log parser state is kept in PARSE_CACHE_FILE so
+    repeated runs only parse bytes appended since the previous run. Logs
+    that need parsing are spread over `workers` processes. With summary,
+    only the final metrics are read from each log's head and tail (per-step
+    loss lists then hold just the final eval).
+    """
+
+    entries = []
+
+    for member in discover_members():
         log_dir = f'experiments/{member}/logs'
 
-        if not os.path.exists(log_dir):
-            continue
-
-        for log_file in sorted(Path(log_dir).glob('*.log')):
+        for log_file in list_logs(log_dir):
             exp_name = log_file.stem
 
             # Parse config from name
@@ -85,24 +453,37 @@ def analyze_experiments():
             if not config:
                 continue
 
-            # Parse log file
-            metrics = parse_log_file(log_file)
+            entries.append((member, exp_name, config, log_file))
+
+    # Parse log files
+    cache = LogParseCache() if use_cache and not summary else None
+    if summary:
+        all_metrics = [summarize_log_file(e[3]) for e in entries]
+    else:
+        sources = [preferred_source(e[3]) for e in entries]
+        all_metrics = ingest_logs(sources, cache=cache, workers=workers)
 
-            # Combine
-            result = {
-                'member': member,
-                'exp_name': exp_name,
-                **config,
-                **metrics
-            }
+    if cache is not None:
+        cache.prune(sources)
+        cache.save()
 
-            results.append(result)
+    # Combine
+    results = []
+    for (member, exp_name, config, _), metrics in zip(entries, all_metrics):
+        results.append({
+            'member': member,
+            'exp_name': exp_name,
+            **config,
+            **metrics
+        })
 
     return results
 
 def create_summary_table(results):
     """Create a summary table of all experiments"""
 
+    import pandas as pd
+
     df = pd.DataFrame(results)
 
     if df.empty:
@@ -112,17 +493,116 @@ def create_summary_table(results):
     # Select key columns
     columns = [
         'member', 'exp_name', 'exp_num', 'block_size', 'n_layer', 'n_head', 'n_embd',
-        'batch_size', 'max_iters', 'dropout', 'num_parameters',
+        'batch_size', 'max_iters', 'dropout', 'learning_rate', 'num_parameters',
         'final_train_loss', 'final_val_loss', 'duration'
     ]
 
     summary_df = df[columns].copy()
 
+    # CPU time is only recorded by newer runners
+    summary_df['cpu_seconds'] = df['cpu_seconds']
+
+    # Training tokens processed (iterations 0..max_iters, no gradient accumulation)
+    summary_df['tokens'] = (summary_df['max_iters'] + 1) * summary_df['batch_size'] * summary_df['block_size']
+
     # Calculate overfitting gap
     summary_df['val_train_gap'] = summary_df['final_val_loss'] - summary_df['final_train_loss']
 
+    # Steady-state training throughput
+    summary_df['iter_ms'] = df['iter_ms']
+    summary_df['tokens_per_sec'] = summary_df['batch_size'] * summary_df['block_size'] / summary_df['iter_ms'] * 1000
+
+    # MFU as nanoGPT's estimate_mfu() computes it, from the unrounded iteration time
+    flops_per_token = (6 * summary_df['num_parameters'] * 1e6
+                       + 12 * summary_df['n_layer'] * summary_df['n_embd'] * summary_df['block_size'])
+    summary_df['mfu'] = flops_per_token * summary_df['tokens_per_sec'] / PEAK_FLOPS * 100
+
+    # Iteration-latency distribution and outlier counts by cause
+    latency_columns = ['iter_p50', 'iter_p90', 'iter_p99', 'iter_cv'] + [f'outliers_{c}' for c in OUTLIER_CAUSES]
+    for column in latency_columns:
+        summary_df[column] = df[column]
+
     return summary_df
 
+def pareto_ranks(costs, losses):
+    """Non-dominated front of each point (1 = Pareto frontier), both objectives minimized
+
+    Points are visited in (cost, loss) order. Each front remembers the
+    lowest loss it has taken so far, and those minima increase from one
+    front to the next, so a point's front is found by binary search:
+    O(n log n) overall.
+    """
+    order = sorted(range(len(costs)), key=lambda i: (costs[i], losses[i]))
+    front_mins = []
+    ranks = [0] * len(costs)
+
+    for i in order:
+        # First front whose best loss this point beats
+        k = bisect.bisect_right(front_mins, losses[i])
+        if k == len(front_mins):
+            front_mins.append(losses[i])
+        else:
+            front_mins[k] = losses[i]
+        ranks[i] = k + 1
+
+    return ranks
+
+def pareto_frontiers(df, response='final_val_loss'):
+    """Pareto-optimal rows of validation loss against each compute cost"""
+    import pandas as pd
+
+    frontiers = []
+    for cost in PARETO_COSTS:
+        if cost not in df:
+            continue
+        data = df.dropna(subset=[cost, response])
+        if data.empty:
+            continue
+        ranks = pareto_ranks(data[cost].tolist(), data[response].tolist())
+        frontier = data[[r == 1 for r in ranks]].sort_values(cost)
+        frontiers.append(pd.DataFrame({
+            'cost': cost,
+            'member': frontier['member'],
+            'exp_name': frontier['exp_name'],
+            'cost_value': frontier[cost],
+            response: frontier[response]
+        }))
+
+    return pd.concat(frontiers, ignore_index=True) if frontiers else pd.DataFrame()
+
+def print_pareto_frontiers(df):
+    """Print the loss-vs-cost Pareto frontiers and save them to CSV"""
+
+    frontiers = pareto_frontiers(df)
+    if frontiers.empty:
+        return
+
+    print("\n" + "-"*80)
+    print("PARETO FRONTIERS (validation loss vs compute cost):")
+    print("-"*80)
+    for cost, frontier in frontiers.groupby('cost', sort=False):
+        print(f"{cost} ({len(frontier)} non-dominated configs):")
+        for _, row in frontier.iterrows():
+            print(f"  {row['cost_value']:>12.6g}  {row['final_val_loss']:.4f}  {row['member']}/{row['exp_name']}")
+
+    output_file = 'experiments/pareto_frontier.csv'
+    frontiers.to_csv(output_file, index=False)
+    print(f"Pareto frontiers saved to: {output_file}")
+
+def expected_experiments():
+    """Number of generated experiments per member (refinement rounds included), or None"""
+    from experiment_manifest import load_experiments
+
+    try:
+        experiments = load_experiments()
+    except (FileNotFoundError, OSError, ValueError):
+        return None
+
+    counts = {}
+    for exp in experiments:
+        counts[exp['member']] = counts.get(exp['member'], 0) + 1
+    return counts
+
 def print_statistics(df):
     """Print summary statistics"""
 
@@ -133,16 +613,27 @@ def print_statistics(df):
     print("EXPERIMENT SUMMARY STATISTICS")
     print("="*80)
 
+    # Members missing from the manifest count as complete
+    expected = expected_experiments()
+    if expected:
+        for member, count in df['member'].value_counts().items():
+            expected.setdefault(member, count)
+
     print(f"\nTotal experiments completed: {len(df)}")
-    print(f"Total experiments expected: 128")
-    print(f"Progress: {len(df)/128*100:.1f}%")
+    if expected:
+        total = sum(expected.values())
+        print(f"Total experiments expected: {total}")
+        print(f"Progress: {len(df)/total*100:.1f}%")
 
     print("\n" + "-"*80)
     print("BY MEMBER:")
     print("-"*80)
     for member in df['member'].unique():
         member_df = df[df['member'] == member]
-        print(f"{member}: {len(member_df)}/32 experiments")
+        if expected and member in expected:
+            print(f"{member}: {len(member_df)}/{expected[member]} experiments")
+        else:
+            print(f"{member}: {len(member_df)} experiments")
 
     print("\n" + "-"*80)
     print("LOSS STATISTICS:")
@@ -168,6 +659,158 @@ def print_statistics(df):
 
     print("\n" + "="*80)
 
+def factorial_effects(df, response='final_val_loss'):
+    """Main effects and two-way interactions of the (possibly fractional) design"""
+
+    import pandas as pd
+
+    design = load_design()
+    aliases = design['aliases'] if design and design['fraction'] > 1 else None
+
+    # Only the factorial sweep itself (not refinement rounds) is a two-level design
+    sweep = df[df['member'].str.match(r'member\d+$')]
+    effects = pd.DataFrame(estimate_effects(sweep, FACTORS, response, max_order=2, aliases=aliases))
+
+    if effects.empty:
+        return effects
+
+    effects.insert(0, 'response', response)
+    return effects.reindex(effects['estimate'].abs().sort_values(ascending=False).index)
+
+def print_throughput_leaderboard(df, top_n=10):
+    """Rank configurations by steady-state training throughput and save the leaderboard"""
+
+    ranked = df.dropna(subset=['tokens_per_sec'])
+    if ranked.empty:
+        return
+
+    ranked = ranked.assign(val_rank=ranked['final_val_loss'].rank(method='min').astype('Int64'))
+    ranked = ranked.sort_values('tokens_per_sec', ascending=False)
+
+    print("\n" + "-"*80)
+    print("THROUGHPUT LEADERBOARD (steady-state, warm-up and eval iterations excluded):")
+    print("-"*80)
+    print(ranked.head(top_n)[
+        ['member', 'exp_name', 'iter_ms', 'tokens_per_sec', 'mfu', 'final_val_loss', 'val_rank']
+    ].to_string(index=False, formatters={
+        'iter_ms': '{:.1f}'.format,
+        'tokens_per_sec': '{:.0f}'.format,
+        'mfu': '{:.4f}%'.format
+    }))
+
+    output_file = 'experiments/throughput_leaderboard.csv'
+    ranked[['member', 'exp_name', 'block_size', 'n_layer', 'n_head', 'n_embd', 'batch_size',
+            'num_parameters', 'iter_ms', 'tokens_per_sec', 'mfu', 'final_val_loss', 'val_rank']
+           ].to_csv(output_file, index=False)
+    print(f"Throughput leaderboard saved to: {output_file}")
+
+def print_latency_analysis(df, results, top_n=10):
+    """Print iteration-latency jitter and outlier attribution; save every outlier to CSV"""
+
+    import pandas as pd
+
+    jitter = df.dropna(subset=['iter_cv'])
+    if jitter.empty:
+        return
+
+    print("\n" + "-"*80)
+    print("ITERATION LATENCY (steady-state percentiles, coefficient of variation):")
+    print("-"*80)
+    print(f"Median CV across experiments: {jitter['iter_cv'].median():.3f}")
+    totals = ", ".join(f"{cause} {int(jitter[f'outliers_{cause}'].sum())}" for cause in OUTLIER_CAUSES)
+    print(f"Outlier iterations by cause: {totals}")
+
+    print("Noisiest experiments (highest CV):")
+    print(jitter.nlargest(top_n, 'iter_cv')[
+        ['member', 'exp_name', 'iter_p50', 'iter_p90', 'iter_p99', 'iter_cv', 'outliers_unexplained']
+    ].to_string(index=False, formatters={
+        'iter_p50': '{:.1f}'.format, 'iter_p90': '{:.1f}'.format,
+        'iter_p99': '{:.1f}'.format, 'iter_cv': '{:.3f}'.format
+    }))
+
+    rows = [{'member': r['member'], 'exp_name': r['exp_name'], **outlier}
+            for r in results for outlier in r.get('iter_outliers', [])]
+    output_file = 'experiments/iteration_outliers.csv'
+    pd.DataFrame(rows, columns=['member', 'exp_name', 'iter', 'time_ms', 'ratio', 'cause']) \
+        .to_csv(output_file, index=False)
+    print(f"Outlier iterations saved to: {output_file}")
+
+def print_factorial_effects(df):
+    """Print factorial effects on validation loss and save all effects to CSV"""
+
+    import pandas as pd
+
+    if df.empty:
+        return
+
+    effects = pd.concat([factorial_effects(df, 'final_val_loss'), factorial_effects(df, 'duration')])
+    if effects.empty:
+        return
+
+    design = load_design()
+    print("\n" + "-"*80)
+    if design and design['fraction'] > 1:
+        print(f"FACTORIAL EFFECTS (1/{design['fraction']} fraction, resolution {design['resolution']}, "
+              f"generators {', '.join(design['generators'])}):")
+    else:
+        print("FACTORIAL EFFECTS (full factorial):")
+    print("-"*80)
+
+    val_effects = effects[effects['response'] == 'final_val_loss']
+    print("Main effects on validation loss (high - low level):")
+    for _, row in val_effects[val_effects['order'] == 1].iterrows():
+        alias = f"  [aliased with {row['aliases']}]" if row['aliases'] else ""
+        print(f"  {row['effect']:<12} {row['estimate']:+.4f}{alias}")
+
+    print("Largest two-way interactions on validation loss:")
+    for _, row in val_effects[val_effects['order'] == 2].head(5).iterrows():
+        alias = f"  [aliased with {row['aliases']}]" if row['aliases'] else ""
+        print(f"  {row['effect']:<24} {row['estimate']:+.4f}{alias}")
+
+    output_file = 'experiments/factorial_effects.csv'
+    effects.to_csv(output_file, index=False)
+    print(f"Factorial effects saved to: {output_file}")
+
+def print_tensor_effects(df):
+    """Print effects from the dense response tensor and save them to CSV"""
+
+    import pandas as pd
+
+    if df.empty:
+        return
+
+    sweep = df[df['member'].str.match(r'member\d+$')]
+    if sweep.empty:
+        return
+
+    results = {response: tensor_effects(sweep, FACTORS, response) for response in ('final_val_loss', 'duration')}
+    val = results['final_val_loss']
+
+    print("\n" + "-"*80)
+    print(f"TENSOR EFFECTS ({' x '.join(str(n) for n in val['shape'])} cells, "
+          f"{val['coverage']*100:.1f}% observed):")
+    print("-"*80)
+
+    marginals = pd.DataFrame(val['marginal_means'])
+    print("Marginal mean validation loss by level:")
+    for factor in FACTORS:
+        levels = marginals[marginals['factor'] == factor]
+        print(f"  {factor:<12} " + "  ".join(f"{row['level']:g}: {row['mean']:.4f}" for _, row in levels.iterrows()))
+
+    effects = pd.DataFrame(val['effects'])
+    interactions = effects[effects['order'] == 2]
+    print("Largest two-way interactions on validation loss:")
+    for _, row in interactions.reindex(interactions['estimate'].abs().sort_values(ascending=False).index).head(5).iterrows():
+        print(f"  {row['effect']:<24} {row['estimate']:+.4f}")
+
+    effects_file = 'experiments/tensor_effects.csv'
+    pd.concat([pd.DataFrame(r['effects']).assign(response=response) for response, r in results.items()]) \
+        .to_csv(effects_file, index=False)
+    means_file = 'experiments/marginal_means.csv'
+    pd.concat([pd.DataFrame(r['marginal_means']) for r in results.values()]).to_csv(means_file, index=False)
+    print(f"Tensor effects saved to: {effects_file}")
+    print(f"Marginal means saved to: {means_file}")
+
 def save_results(df):
     """Save results to CSV"""
 
@@ -181,22 +824,32 @@ def save_results(df):
     # Save best configurations
     best_configs = df.nsmallest(10, 'final_val_loss')[
         ['exp_name', 'member', 'block_size', 'n_layer', 'n_head', 'n_embd',
-         'batch_size', 'max_iters', 'dropout', 'final_val_loss', 'val_train_gap']
+         'batch_size', 'max_iters', 'dropout', 'learning_rate', 'final_val_loss', 'val_train_gap']
     ]
 
     best_file = 'experiments/best_configurations.csv'
     best_configs.to_csv(best_file, index=False)
     print(f"Best configurations saved to: {best_file}")
 
+    # Keep the indexed results store in step with the CSV
+    upsert_results(df.to_dict('records'))
+    print(f"Results store updated: {RESULTS_DB}")
+
 def main():
     """Main analysis function"""
 
+    parser = argparse.ArgumentParser(description="Analyze experiment results")
+    parser.add_argument("--no-cache", action="store_true", help="parse every log from scratch")
+    parser.add_argument("--workers", type=int, default=None, help="log parsing processes (default: one per core)")
+    parser.add_argument("--summary", action="store_true", help="read only the head and tail of each log")
+    parser.add_argument("--tensor", action="store_true", help="add the N-d response tensor effects analysis")
+    args = parser.parse_args()
+
     print("\n" + "#"*80)
     print("# nanoGPT EXPERIMENT RESULTS ANALYSIS")
     print("#"*80)
 
-    # Analyze experiments
-    results = analyze_experiments()
+    results = analyze_experiments(use_cache=not args.no_cache, workers=args.workers, summary=args.summary)
 
     if not results:
         print("\nNo experiments completed yet. Please wait for experiments to finish.")
@@ -211,6 +864,25 @@ def main():
     # Save results
     save_results(df)
 
+    # Main effects and interactions
+    print_factorial_effects(df)
+
+    # Training throughput next to validation loss
+    print_throughput_leaderboard(df)
+
+    # Cheapest configs for each achievable validation loss
+    print_pareto_frontiers(df)
+
+    # Iteration-latency jitter and outliers
+    print_latency_analysis(df, results)
+
+    # Vectorized effects over the dense N-d response tensor
+    if args.tensor:
+        print_tensor_effects(df)
+
+    # Compiled vs eager throughput (only when compiled runs exist)
+    print_compile_comparison(results=results)
+
     # Print sample of results
     print("\n" + "-"*80)
     print("SAMPLE RESULTS (Top 10 by validation loss):")
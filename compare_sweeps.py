@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Performance regression gate between two sweeps
+
+Experiments of a baseline and a candidate sweep are matched by config
+fingerprint. Each matched pair is compared on steady-state iteration
+latency (Mann-Whitney U test on the per-iteration times) and tokens/sec,
+and the sweep as a whole on duration (paired t-test on log duration ratios).
+A change counts as a regression only if it is both statistically
+significant and larger than the noise threshold. The environment each
+sweep ran in (saved by the runner as environment.json) is shown side by
+side so torch/thread/CPU changes are visible.
+
+Usage:
+    python compare_sweeps.py <baseline_dir> <candidate_dir> [--threshold 0.05] [--alpha 0.01] [--show N]
+    python compare_sweeps.py --environment        # print this host's environment
+
+Directories are experiment roots such as experiments/ or a copy of an
+older sweep's experiments/ directory. Exits with status 1 on a regression.
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from config_fingerprint import find_prior_runs, read_config_file
+from log_archive import list_logs
+from log_parser import parse_log
+
+ENVIRONMENT_FILE = 'environment.json'
+
+def capture_environment():
+    """Software and hardware details that affect training speed"""
+    env = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'cpu_model': platform.processor() or None,
+        'torch': None,
+        'torch_threads': None,
+        'torch_interop_threads': None,
+    }
+    for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS'):
+        env[var] = os.environ.get(var)
+
+    try:
+        with open('/proc/cpuinfo', 'r') as f:
+            for line in f:
+                if line.startswith('model name'):
+                    env['cpu_model'] = line.split(':', 1)[1].strip()
+                    break
+    except OSError:
+        pass
+
+    try:
+        import torch
+        env['torch'] = torch.__version__
+        env['torch_threads'] = torch.get_num_threads()
+        env['torch_interop_threads'] = torch.get_num_interop_threads()
+    except ImportError:
+        pass
+
+    return env
+
+def save_environment(root='experiments'):
+    """Record the environment of a sweep next to its results"""
+    with open(Path(root) / ENVIRONMENT_FILE, 'w') as f:
+        json.dump(capture_environment(), f, indent=2)
+
+def load_environment(root):
+    """Environment a sweep was run in, or None if it wasn't recorded"""
+    try:
+        with open(Path(root) / ENVIRONMENT_FILE, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def mann_whitney(a, b):
+    """Mann-Whitney U test (normal approximation, tie-corrected); returns (z, two-sided p)
+
+    z > 0 means values in b tend to be larger than in a.
+    """
+    a, b = np.asarray(a, dtype=float), np.asarray(b, dtype=float)
+    n1, n2 = len(a), len(b)
+    values = np.concatenate([a, b])
+
+    # Average ranks with ties
+    order = values.argsort(kind='mergesort')
+    sorted_values = values[order]
+    ranks = np.empty(len(values))
+    _, starts, counts = np.unique(sorted_values, return_index=True, return_counts=True)
+    for start, count in zip(starts, counts):
+        ranks[order[start:start + count]] = start + (count + 1) / 2
+
+    u = ranks[n1:].sum() - n2 * (n2 + 1) / 2
+    mean = n1 * n2 / 2
+    n = n1 + n2
+    tie_term = (counts ** 3 - counts).sum() / (n * (n - 1))
+    var = n1 * n2 / 12 * ((n + 1) - tie_term)
+    if var <= 0:
+        return 0.0, 1.0
+
+    z = (u - mean) / math.sqrt(var)
+    return z, math.erfc(abs(z) / math.sqrt(2))
+
+def _betacf(a, b, x):
+    """Continued fraction of the regularized incomplete beta function (modified Lentz)"""
+    tiny = 1e-300
+    c, d = 1.0, 1.0 - (a + b) * x / (a + 1)
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 300):
+        for num in (m * (b - m) * x / ((a + 2 * m - 1) * (a + 2 * m)),
+                    -(a + m) * (a + b + m) * x / ((a + 2 * m) * (a + 2 * m + 1))):
+            d = 1.0 + num * d
+            d = 1.0 / (d if abs(d) > tiny else tiny)
+            c = 1.0 + num / c
+            c = c if abs(c) > tiny else tiny
+            h *= d * c
+        if abs(d * c - 1.0) < 1e-12:
+            break
+    return h
+
+def betainc(a, b, x):
+    """Regularized incomplete beta function I_x(a, b)"""
+    if x <= 0:
+        return 0.0
+    if x >= 1:
+        return 1.0
+    front = math.exp(math.lgamma(a + b) - math.lgamma(a) - math.lgamma(b)
+                     + a * math.log(x) + b * math.log1p(-x))
+    # The continued fraction converges fast only below the mean; use symmetry above it
+    if x < (a + 1) / (a + b + 2):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+def student_t_p(t, df):
+    """Two-sided p-value of a Student-t statistic with df degrees of freedom"""
+    return betainc(df / 2, 0.5, df / (df + t * t))
+
+def paired_log_ratio_test(base, cand):
+    """Geometric-mean ratio cand/base and two-sided p of a paired t-test on log ratios"""
+    ratios = np.log(np.asarray(cand, dtype=float) / np.asarray(base, dtype=float))
+    gmean = float(np.exp(ratios.mean()))
+    if len(ratios) < 2 or ratios.std(ddof=1) == 0:
+        return gmean, 1.0
+    t = float(ratios.mean() / (ratios.std(ddof=1) / math.sqrt(len(ratios))))
+    return gmean, student_t_p(t, len(ratios) - 1)
+
+def sweep_runs(root):
+    """Map fingerprint -> (exp_name, config, parsed log) of a sweep's completed runs"""
+    from analyze_results import steady_state_times
+
+    logs = {}
+    runs = {}
+    for fingerprint, matches in find_prior_runs(root).items():
+        run = matches[0]
+        log_dir = Path(run['config_path']).parent.parent / 'logs'
+        if log_dir not in logs:
+            logs[log_dir] = {log.stem: log for log in list_logs(log_dir)}
+
+        state = parse_log(logs[log_dir][run['exp_name']])
+        runs[fingerprint] = {
+            'exp_name': f"{run['member']}/{run['exp_name']}",
+            'config': read_config_file(run['config_path']),
+            'duration': state['duration'],
+            'times': steady_state_times(state)
+        }
+    return runs
+
+def compare(baseline, candidate, threshold=0.05, alpha=0.01):
+    """Per-config comparison rows and the paired duration summary"""
+    rows = []
+    for fingerprint in sorted(set(baseline) & set(candidate)):
+        base, cand = baseline[fingerprint], candidate[fingerprint]
+        config = base['config']
+        tokens = config.get('batch_size', 0) * config.get('block_size', 0)
+
+        row = {
+            'exp_name': base['exp_name'],
+            'duration_base': base['duration'],
+            'duration_cand': cand['duration'],
+            'p50_base': None, 'p50_cand': None,
+            'tokens_per_sec_base': None, 'tokens_per_sec_cand': None,
+            'speed_ratio': None, 'p_value': None, 'regression': False
+        }
+
+        if len(base['times']) >= 2 and len(cand['times']) >= 2:
+            row['p50_base'] = float(np.median(base['times']))
+            row['p50_cand'] = float(np.median(cand['times']))
+            row['tokens_per_sec_base'] = tokens / np.mean(base['times']) * 1000
+            row['tokens_per_sec_cand'] = tokens / np.mean(cand['times']) * 1000
+            row['speed_ratio'] = row['tokens_per_sec_cand'] / row['tokens_per_sec_base']
+
+            z, p = mann_whitney(base['times'], cand['times'])
+            row['p_value'] = p
+            # Slower iterations, beyond the noise threshold, and significant
+            row['regression'] = z > 0 and p < alpha and row['speed_ratio'] < 1 - threshold
+
+        rows.append(row)
+
+    timed = [r for r in rows if r['duration_base'] and r['duration_cand']]
+    summary = {'matched': len(rows), 'duration_ratio': None, 'duration_p': None}
+    if timed:
+        summary['duration_ratio'], summary['duration_p'] = paired_log_ratio_test(
+            [r['duration_base'] for r in timed], [r['duration_cand'] for r in timed])
+
+    return rows, summary
+
+def print_environment_diff(base_env, cand_env):
+    """Print the recorded environments side by side, marking differences"""
+    if base_env is None and cand_env is None:
+        print("No environment.json recorded for either sweep")
+        return
+
+    base_env, cand_env = base_env or {}, cand_env or {}
+    for key in sorted(set(base_env) | set(cand_env)):
+        b, c = base_env.get(key), cand_env.get(key)
+        marker = '*' if b != c else ' '
+        print(f" {marker} {key:<22} {str(b):<28} {c}")
+
+def main():
+    """Compare two sweeps and exit non-zero on a regression"""
+
+    parser = argparse.ArgumentParser(description="Compare two sweeps for performance regressions")
+    parser.add_argument("baseline", nargs='?', help="baseline experiments directory")
+    parser.add_argument("candidate", nargs='?', help="candidate experiments directory")
+    parser.add_argument("--threshold", type=float, default=0.05, help="relative change treated as noise")
+    parser.add_argument("--alpha", type=float, default=0.01, help="significance level")
+    parser.add_argument("--show", type=int, default=15, help="largest slowdowns to list besides regressions")
+    parser.add_argument("--environment", action="store_true", help="print this host's environment")
+    args = parser.parse_args()
+
+    if args.environment:
+        print(json.dumps(capture_environment(), indent=2))
+        return
+
+    if not args.baseline or not args.candidate:
+        parser.error("baseline and candidate directories are required")
+
+    baseline = sweep_runs(args.baseline)
+    candidate = sweep_runs(args.candidate)
+    rows, summary = compare(baseline, candidate, args.threshold, args.alpha)
+
+    print(f"\n{'#'*80}")
+    print("# SWEEP PERFORMANCE COMPARISON")
+    print(f"# Baseline:  {args.baseline} ({len(baseline)} runs)")
+    print(f"# Candidate: {args.candidate} ({len(candidate)} runs)")
+    print(f"# Matched by config fingerprint: {summary['matched']}")
+    print(f"{'#'*80}\n")
+
+    print("ENVIRONMENT (* = differs):")
+    print_environment_diff(load_environment(args.baseline), load_environment(args.candidate))
+
+    if not rows:
+        print("\nNo matching experiments to compare")
+        return
+
+    print("\n" + "-"*80)
+    print(f"{'experiment':<52} {'tok/s base':>10} {'tok/s cand':>10} {'ratio':>6} {'p':>8}")
+    print("-"*80)
+    timed_rows = sorted((r for r in rows if r['speed_ratio'] is not None), key=lambda r: r['speed_ratio'])
+    for rank, row in enumerate(timed_rows):
+        if rank >= args.show and not row['regression']:
+            continue
+        flag = '  REGRESSION' if row['regression'] else ''
+        print(f"{row['exp_name']:<52} {row['tokens_per_sec_base']:>10.0f} {row['tokens_per_sec_cand']:>10.0f} "
+              f"{row['speed_ratio']:>6.3f} {row['p_value']:>8.1e}{flag}")
+
+    regressions = [r for r in rows if r['regression']]
+    duration_regressed = (summary['duration_ratio'] is not None
+                          and summary['duration_ratio'] > 1 + args.threshold
+                          and summary['duration_p'] < args.alpha)
+
+    print("\n" + "-"*80)
+    if summary['duration_ratio'] is not None:
+        print(f"Duration (candidate / baseline, geometric mean): {summary['duration_ratio']:.3f} "
+              f"(p = {summary['duration_p']:.1e})")
+    print(f"Configs with significant throughput regressions: {len(regressions)}/{len(rows)}")
+
+    if regressions or duration_regressed:
+        print("RESULT: REGRESSION")
+        sys.exit(1)
+    print("RESULT: OK")
+
+if __name__ == "__main__":
+    main()
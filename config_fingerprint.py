@@ -0,0 +1,205 @@
+#!/usr/bin/env python3
+"""
+Canonical fingerprints of fully-resolved nanoGPT training configs
+
+An experiment config only lists overrides. nanoGPT resolves the final
+config as train.py defaults <- config/train_shakespeare_char.py <- the
+experiment config, so two configs are the same experiment exactly when
+their resolved configs match (ignoring output/logging destinations).
+
+Usage:
+    python config_fingerprint.py <config.py> [...]   # print fingerprints
+    python config_fingerprint.py --prior              # list completed runs by fingerprint
+"""
+import ast
+import hashlib
+import json
+import os
+import sys
+from pathlib import Path
+
+from log_archive import log_completed, archived_logs
+
+NANOGPT_DIR = 'nanoGPT'
+BASE_CONFIG_FILE = 'config/train_shakespeare_char.py'
+
+# Defaults from nanoGPT train.py (dtype as resolved on a CPU-only host)
+TRAIN_DEFAULTS = {
+    "out_dir": "out",
+    "eval_interval": 2000,
+    "log_interval": 1,
+    "eval_iters": 200,
+    "eval_only": False,
+    "always_save_checkpoint": True,
+    "init_from": "scratch",
+    "wandb_log": False,
+    "wandb_project": "owt",
+    "wandb_run_name": "gpt2",
+    "dataset": "openwebtext",
+    "gradient_accumulation_steps": 40,
+    "batch_size": 12,
+    "block_size": 1024,
+    "n_layer": 12,
+    "n_head": 12,
+    "n_embd": 768,
+    "dropout": 0.0,
+    "bias": False,
+    "learning_rate": 6e-4,
+    "max_iters": 600000,
+    "weight_decay": 1e-1,
+    "beta1": 0.9,
+    "beta2": 0.95,
+    "grad_clip": 1.0,
+    "decay_lr": True,
+    "warmup_iters": 2000,
+    "lr_decay_iters": 600000,
+    "min_lr": 6e-5,
+    "backend": "nccl",
+    "device": "cuda",
+    "dtype": "float16",
+    "compile": True,
+}
+
+# Overrides from nanoGPT config/train_shakespeare_char.py
+SHAKESPEARE_CHAR_CONFIG = {
+    "out_dir": "out-shakespeare-char",
+    "eval_interval": 250,
+    "eval_iters": 200,
+    "log_interval": 10,
+    "always_save_checkpoint": False,
+    "wandb_log": False,
+    "wandb_project": "shakespeare-char",
+    "wandb_run_name": "mini-gpt",
+    "dataset": "shakespeare_char",
+    "gradient_accumulation_steps": 1,
+    "batch_size": 64,
+    "block_size": 256,
+    "n_layer": 6,
+    "n_head": 6,
+    "n_embd": 384,
+    "dropout": 0.2,
+    "learning_rate": 1e-3,
+    "max_iters": 5000,
+    "lr_decay_iters": 5000,
+    "min_lr": 1e-4,
+    "beta2": 0.99,
+    "warmup_iters": 100,
+}
+
+# Keys that only choose where output goes, not what is trained
+IGNORED_KEYS = {"out_dir", "wandb_log", "wandb_project", "wandb_run_name"}
+
+def read_config_file(path):
+    """Read the literal `key = value` assignments from a nanoGPT-style config file"""
+    with open(path, 'r') as f:
+        tree = ast.parse(f.read(), filename=str(path))
+
+    config = {}
+    for node in tree.body:
+        if not isinstance(node, ast.Assign) or len(node.targets) != 1:
+            continue
+        target = node.targets[0]
+        if not isinstance(target, ast.Name):
+            continue
+        try:
+            config[target.id] = ast.literal_eval(node.value)
+        except ValueError:
+            # Non-literal expressions (e.g. 5 * 8) keep the built-in default
+            continue
+    return config
+
+def load_base_defaults(nanogpt_dir=NANOGPT_DIR):
+    """Return train.py defaults overlaid with train_shakespeare_char.py
+
+    Reads the files from a local nanoGPT checkout when present so the
+    fingerprint tracks edits to them, otherwise uses the built-in copies.
+    """
+    defaults = dict(TRAIN_DEFAULTS)
+
+    train_file = os.path.join(nanogpt_dir, 'train.py')
+    if os.path.exists(train_file):
+        train_config = read_config_file(train_file)
+        defaults.update({k: v for k, v in train_config.items() if k in TRAIN_DEFAULTS and k != 'dtype'})
+
+    base_file = os.path.join(nanogpt_dir, BASE_CONFIG_FILE)
+    if os.path.exists(base_file):
+        defaults.update(read_config_file(base_file))
+    else:
+        defaults.update(SHAKESPEARE_CHAR_CONFIG)
+
+    return defaults
+
+_base_defaults = None
+
+def resolve_config(config):
+    """Return the fully-resolved config nanoGPT would train with"""
+    global _base_defaults
+    if _base_defaults is None:
+        _base_defaults = load_base_defaults()
+
+    resolved = dict(_base_defaults)
+    resolved.update(config)
+    return resolved
+
+def _canonical_value(value):
+    """Normalize values so equal settings serialize identically"""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+def config_fingerprint(config):
+    """Return a stable fingerprint of the resolved config"""
+    resolved = resolve_config(config)
+    canonical = {k: _canonical_value(v) for k, v in resolved.items() if k not in IGNORED_KEYS}
+    payload = json.dumps(canonical, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+def find_prior_runs(root='experiments'):
+    """Map fingerprint -> completed runs found under the experiments directory"""
+    prior = {}
+    archives = {}
+
+    for config_file in sorted(Path(root).glob('*/configs/*.py')):
+        member = config_file.parent.parent.name
+        log_dir = config_file.parent.parent / 'logs'
+        log_file = log_dir / f'{config_file.stem}.log'
+
+        # Archived logs were complete when packed
+        if not log_file.exists():
+            if log_dir not in archives:
+                archives[log_dir] = archived_logs(log_dir)
+            if config_file.stem not in archives[log_dir]:
+                continue
+            log_file = archives[log_dir][config_file.stem]
+        elif not log_completed(log_file):
+            continue
+
+        fingerprint = config_fingerprint(read_config_file(config_file))
+        prior.setdefault(fingerprint, []).append({
+            "member": member,
+            "exp_name": config_file.stem,
+            "config_path": str(config_file),
+            "log_file": str(log_file)
+        })
+
+    return prior
+
+def main():
+    """Command-line interface"""
+    if len(sys.argv) < 2:
+        print(__doc__.strip())
+        sys.exit(1)
+
+    if sys.argv[1] == '--prior':
+        prior = find_prior_runs()
+        for fingerprint, runs in sorted(prior.items()):
+            names = ', '.join(f"{r['member']}/{r['exp_name']}" for r in runs)
+            print(f"{fingerprint}  {names}")
+        print(f"\n{len(prior)} distinct completed configs")
+        return
+
+    for path in sys.argv[1:]:
+        print(f"{config_fingerprint(read_config_file(path))}  {path}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Columnar store of per-iteration training curves
+
+Every experiment's parsed curves are concatenated into one raw binary file
+per column under experiments/curves/, with index.json mapping each run to
+its row range and recording how many rows each column holds. Arrays are
+opened memory-mapped, so a curve is a slice of the mapped file: plotting
+or analyzing thousands of runs touches only the rows actually used and
+never re-parses logs.
+
+Building is incremental. When no log has changed, nothing is written. New
+and changed runs are appended to the column files, and a changed run's
+old rows are left unreferenced. The store is rewritten only when dead rows
+outnumber live ones. A rewrite goes to a new generation of files, so
+readers never see a half-written store.
+
+Iteration columns: iteration, loss, time_ms, mfu (one row per iter line)
+Eval columns:      step, train_loss, val_loss (one row per eval line)
+Missing values (e.g. no time/mfu on an iter line) are stored as NaN.
+
+Usage:
+    python curve_store.py build              # parse new/changed logs into the store
+    python curve_store.py list [member]
+    python curve_store.py show <member> <exp_name>
+"""
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+from log_archive import list_logs
+from log_parser import parse_log, source_signature
+
+CURVE_DIR = 'experiments/curves'
+INDEX_NAME = 'index.json'
+STORE_VERSION = 2
+
+ITER_COLUMNS = {'iteration': np.int64, 'loss': np.float64, 'time_ms': np.float64, 'mfu': np.float64}
+EVAL_COLUMNS = {'step': np.int64, 'train_loss': np.float64, 'val_loss': np.float64}
+COLUMNS = {**ITER_COLUMNS, **EVAL_COLUMNS}
+
+# Parser state list feeding each column
+STATE_KEYS = {
+    'iteration': 'iterations', 'loss': 'iter_losses', 'time_ms': 'iter_times', 'mfu': 'mfus',
+    'step': 'eval_steps', 'train_loss': 'train_losses', 'val_loss': 'val_losses'
+}
+
+def _column_path(curve_dir, name, generation):
+    return Path(curve_dir) / f'{name}.{generation}.bin'
+
+def _column(values, dtype):
+    """State list -> array, with None stored as NaN"""
+    if dtype is np.int64:
+        return np.asarray(values, dtype=dtype)
+    return np.array([np.nan if v is None else v for v in values], dtype=dtype)
+
+class CurveStore:
+    """Read-only, memory-mapped view of the curve store"""
+
+    def __init__(self, curve_dir=CURVE_DIR):
+        self.curve_dir = Path(curve_dir)
+        with open(self.curve_dir / INDEX_NAME, 'r') as f:
+            index = json.load(f)
+        if index.get('version') != STORE_VERSION:
+            raise ValueError(f"{self.curve_dir} was built by another store version; rebuild it")
+
+        self.runs = index['runs']
+        self.generation = index['generation']
+        self.rows = index['rows']
+        self.columns = {}
+        for name, dtype in COLUMNS.items():
+            n = self.rows['iter' if name in ITER_COLUMNS else 'eval']
+            path = _column_path(self.curve_dir, name, self.generation)
+            # Rows appended after this index was written are ignored
+            self.columns[name] = np.memmap(path, dtype=dtype, mode='r', shape=(n,)) if n else np.empty(0, dtype)
+
+    def __len__(self):
+        return len(self.runs)
+
+    def __contains__(self, key):
+        return key in self.runs
+
+    def keys(self, member=None):
+        """Run keys (member/exp_name), optionally for one member, sorted"""
+        prefix = f'{member}/' if member else ''
+        return sorted(key for key in self.runs if key.startswith(prefix))
+
+    def curve(self, key):
+        """Column slices (views into the mapped files) for one run"""
+        run = self.runs[key]
+        i0, i1 = run['iter']
+        e0, e1 = run['eval']
+        data = {name: self.columns[name][i0:i1] for name in ITER_COLUMNS}
+        data.update({name: self.columns[name][e0:e1] for name in EVAL_COLUMNS})
+        return data
+
+def open_store(curve_dir=CURVE_DIR):
+    """The curve store, or None if it hasn't been built"""
+    if not (Path(curve_dir) / INDEX_NAME).exists():
+        return None
+    try:
+        return CurveStore(curve_dir)
+    except (OSError, ValueError):
+        return None
+
+def _parse_curves(log_file):
+    """Column arrays of one log"""
+    state = parse_log(log_file)
+    return {name: _column(state[STATE_KEYS[name]], dtype) for name, dtype in COLUMNS.items()}
+
+def _write_runs(curve_dir, generation, rows, items, runs, mode):
+    """Write (key, member, log_file, signature, data or None) runs to the column files
+
+    Runs are written one at a time after the given row counts (data None
+    means parse the log), so memory use is that of the largest run.
+    Returns the new row counts and the number of logs parsed.
+    """
+    files = {name: open(_column_path(curve_dir, name, generation), mode) for name in COLUMNS}
+    iter_rows, eval_rows = rows['iter'], rows['eval']
+
+    # Drop anything written after the index was (e.g. by an interrupted build)
+    for name, dtype in COLUMNS.items():
+        files[name].seek((iter_rows if name in ITER_COLUMNS else eval_rows) * np.dtype(dtype).itemsize)
+        files[name].truncate()
+    parsed = 0
+    try:
+        for key, member, log_file, signature, data in items:
+            if data is None:
+                data = _parse_curves(log_file)
+                parsed += 1
+            for name, dtype in COLUMNS.items():
+                files[name].write(np.ascontiguousarray(data[name], dtype=dtype).tobytes())
+
+            n_iter, n_eval = len(data['iteration']), len(data['step'])
+            runs[key] = {
+                'member': member,
+                'exp_name': log_file.stem,
+                'iter': [iter_rows, iter_rows + n_iter],
+                'eval': [eval_rows, eval_rows + n_eval],
+                'source': signature
+            }
+            iter_rows += n_iter
+            eval_rows += n_eval
+    finally:
+        for f in files.values():
+            f.close()
+    return {'iter': iter_rows, 'eval': eval_rows}, parsed
+
+def _write_index(curve_dir, generation, rows, runs):
+    """Atomically replace the index; readers switch to the new rows at this point"""
+    tmp_path = Path(curve_dir) / f'{INDEX_NAME}.{os.getpid()}.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': STORE_VERSION, 'generation': generation, 'rows': rows, 'runs': runs}, f, indent=1)
+    os.replace(tmp_path, Path(curve_dir) / INDEX_NAME)
+
+def build_store(root='experiments', curve_dir=CURVE_DIR):
+    """Bring the store up to date with the logs under root; return (runs, parsed)
+
+    Nothing is written when every run's source log is unchanged. Otherwise
+    new and changed runs are parsed and appended; the files are only
+    rewritten (copying unchanged runs from the old store) when more than
+    half of their rows would be dead.
+    """
+    curve_dir = Path(curve_dir)
+    curve_dir.mkdir(parents=True, exist_ok=True)
+    old = open_store(curve_dir)
+
+    current = {}
+    for log_dir in sorted(Path(root).glob('*/logs')):
+        member = log_dir.parent.name
+        for log_file in list_logs(log_dir):
+            current[f'{member}/{log_file.stem}'] = (member, log_file, source_signature(log_file))
+
+    def unchanged(key):
+        return old is not None and key in old.runs and old.runs[key]['source'] == current[key][2]
+
+    changed = [key for key in sorted(current) if not unchanged(key)]
+    if old is not None and not changed and len(old.runs) == len(current):
+        return len(current), 0
+
+    runs = {key: old.runs[key] for key in current if unchanged(key)}
+    live = sum(run['iter'][1] - run['iter'][0] for run in runs.values())
+
+    if old is not None and old.rows['iter'] - live <= live:
+        # Append the new and changed runs after the existing rows
+        items = [(key, *current[key], None) for key in changed]
+        rows, parsed = _write_runs(curve_dir, old.generation, old.rows, items, runs, 'r+b')
+        _write_index(curve_dir, old.generation, rows, runs)
+        return len(runs), parsed
+
+    # Rewrite into a new generation of files, then switch the index to it
+    generation = old.generation + 1 if old is not None else 0
+    items = [(key, *current[key], old.curve(key) if unchanged(key) else None) for key in sorted(current)]
+    runs = {}
+    rows, parsed = _write_runs(curve_dir, generation, {'iter': 0, 'eval': 0}, items, runs, 'wb')
+    _write_index(curve_dir, generation, rows, runs)
+
+    del old, items
+    for path in curve_dir.glob('*.bin'):
+        if not path.name.endswith(f'.{generation}.bin'):
+            path.unlink()
+    for path in curve_dir.glob('*.npy'):
+        # Files of the previous store format
+        path.unlink()
+
+    return len(runs), parsed
+
+def main():
+    """Command-line interface"""
+    if len(sys.argv) < 2 or sys.argv[1] not in ('build', 'list', 'show'):
+        print(__doc__.strip())
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == 'build':
+        total, parsed = build_store()
+        print(f"Curve store: {total} runs ({parsed} parsed) in {CURVE_DIR}/")
+        return
+
+    store = open_store()
+    if store is None:
+        print("No curve store found. Run: python curve_store.py build")
+        sys.exit(1)
+
+    if command == 'list':
+        member = sys.argv[2] if len(sys.argv) > 2 else None
+        for key in store.keys(member):
+            run = store.runs[key]
+            print(f"{key}\t{run['iter'][1] - run['iter'][0]} iters, {run['eval'][1] - run['eval'][0]} evals")
+
+    else:
+        if len(sys.argv) != 4:
+            print("Usage: python curve_store.py show <member> <exp_name>")
+            sys.exit(1)
+        key = f'{sys.argv[2]}/{sys.argv[3]}'
+        if key not in store:
+            print(f"{key} is not in the curve store")
+            sys.exit(1)
+        data = store.curve(key)
+        for step, train_loss, val_loss in zip(data['step'], data['train_loss'], data['val_loss']):
+            print(f"step {step}: train loss {train_loss:.4f}, val loss {val_loss:.4f}")
+        print(f"{len(data['iteration'])} iteration rows")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Run-time prediction for experiments and a live ETA for sweeps
+
+Durations are modelled as a linear function of compute features derived
+from the config: training FLOPs (nanoGPT's 6N + 12LET per token), eval
+FLOPs (forward passes over eval_iters batches per eval, plus the number of
+evals, which also covers checkpoint saves) and the number of iterations
+(fixed per-step overhead). The model is fit with least squares on every
+successful run in the results store.
+
+Usage:
+    python duration_model.py [--workers N]    # predict the manifest's sweep, leave-one-out error
+"""
+import argparse
+import heapq
+import os
+import threading
+import time
+
+import numpy as np
+
+from generate_experiments import base_config
+
+FEATURES = ['intercept', 'train_tflops', 'eval_tflops', 'iters', 'evals']
+
+def config_features(config):
+    """Feature vector of one config (missing eval settings use the sweep's base config)"""
+    n_layer, n_embd = config['n_layer'], config['n_embd']
+    block_size, batch_size = config['block_size'], config['batch_size']
+    eval_interval = config.get('eval_interval', base_config['eval_interval'])
+    eval_iters = config.get('eval_iters', base_config['eval_iters'])
+
+    iters = config['max_iters'] + 1
+    evals = config['max_iters'] // eval_interval + 1
+
+    # Non-embedding parameters (12 * n_embd^2 per transformer block)
+    params = 12 * n_layer * n_embd ** 2
+    flops_per_token = 6 * params + 12 * n_layer * n_embd * block_size
+    tokens_per_batch = batch_size * block_size
+
+    train_flops = flops_per_token * tokens_per_batch * iters
+    # Forward only (a third of training FLOPs), train and val splits
+    eval_flops = flops_per_token / 3 * tokens_per_batch * eval_iters * 2 * evals
+
+    return [1.0, train_flops / 1e12, eval_flops / 1e12, iters, evals]
+
+class DurationModel:
+    """Least-squares duration model over config_features"""
+
+    def __init__(self):
+        self.coef = None
+        self.rate = None
+        self.X = np.empty((0, len(FEATURES)))
+        self.y = np.empty(0)
+
+    def fit(self, configs, durations):
+        """Fit on finished runs; with too few runs fall back to seconds per TFLOP"""
+        self.X = np.array([config_features(c) for c in configs], dtype=float).reshape(-1, len(FEATURES))
+        self.y = np.array(durations, dtype=float)
+        return self._solve()
+
+    def add(self, config, duration):
+        """Refit with one more finished run, without reloading the others"""
+        self.X = np.vstack([self.X, config_features(config)])
+        self.y = np.append(self.y, duration)
+        return self._solve()
+
+    def _solve(self):
+        X, y = self.X, self.y
+        if len(y) == 0:
+            return self
+
+        self.rate = y.sum() / (X[:, 1] + X[:, 2]).sum()
+        if len(y) > 2 * len(FEATURES):
+            self.coef, *_ = np.linalg.lstsq(X, y, rcond=None)
+        return self
+
+    def predict(self, config):
+        """Predicted duration in seconds (None before any fit)"""
+        x = np.array(config_features(config), dtype=float)
+        if self.coef is not None:
+            # Never predict less than a tenth of the proportional estimate
+            return max(float(x @ self.coef), 0.1 * self.rate * (x[1] + x[2]))
+        if self.rate is not None:
+            return float(self.rate * (x[1] + x[2]))
+        return None
+
+def load_finished_runs():
+    """(config, duration) of every successful run, from the results store or the results CSV"""
+    from results_store import RESULTS_CSV, RESULTS_DB, query
+
+    if os.path.exists(RESULTS_DB):
+        rows = query([('duration', '>', 0), ('status', '=', 'success')], order_by='duration')
+    elif os.path.exists(RESULTS_CSV):
+        import csv
+        with open(RESULTS_CSV, 'r', newline='') as f:
+            rows = [row for row in csv.DictReader(f) if row.get('duration')]
+    else:
+        return [], []
+
+    keys = ['block_size', 'n_layer', 'n_head', 'n_embd', 'batch_size', 'max_iters']
+    configs = [{k: int(float(row[k])) for k in keys} for row in rows]
+    durations = [float(row['duration']) for row in rows]
+    return configs, durations
+
+def fit_from_results():
+    """Duration model fit on every finished run"""
+    return DurationModel().fit(*load_finished_runs())
+
+def schedule_eta(remaining, pending, workers):
+    """Seconds until a queue finishes on `workers` workers
+
+    remaining holds the expected time left of the running jobs and pending
+    the expected durations of queued jobs in run order; each queued job
+    starts on the first worker to free up.
+    """
+    free_at = sorted(remaining)[:workers]
+    free_at += [0.0] * (workers - len(free_at))
+    heapq.heapify(free_at)
+
+    for duration in pending:
+        start = heapq.heappop(free_at)
+        heapq.heappush(free_at, start + duration)
+    return max(free_at) if free_at else 0.0
+
+class SweepETA:
+    """Live ETA for a sweep, refined as experiments finish
+
+    The model is fit on the results store once; every successful run of
+    the sweep is then added to it in memory and updates a correction
+    factor, the ratio of actual to predicted time for this sweep, which
+    absorbs host speed and load. Failed runs only count as done.
+    """
+
+    def __init__(self, experiments, workers=1):
+        self.configs = {idx: exp['config'] for idx, exp in enumerate(experiments, 1)}
+        self.workers = max(1, workers)
+        self.started = {}
+        self.finished = set()
+        self.actual = 0.0
+        self.predicted = 0.0
+        self.samples = 0
+        self.lock = threading.Lock()
+        self.model = fit_from_results()
+        self.fallback = None
+
+    def _expected(self, idx):
+        predicted = self.model.predict(self.configs[idx])
+        if predicted is None:
+            # No history yet: mean of this sweep's finished runs, if any
+            predicted = self.fallback
+        return predicted
+
+    def start(self, idx):
+        """Mark an experiment as running"""
+        with self.lock:
+            self.started[idx] = time.time()
+
+    def finish(self, idx, duration=None):
+        """Record a finished experiment and refine the model (duration None for a failed run)"""
+        with self.lock:
+            expected = self._expected(idx)
+            self.started.pop(idx, None)
+            self.finished.add(idx)
+            if duration is None:
+                return
+
+            if expected:
+                self.actual += duration
+                self.predicted += expected
+            self.samples += 1
+            self.fallback = ((self.fallback or 0) * (self.samples - 1) + duration) / self.samples
+            self.model.add(self.configs[idx], duration)
+
+    def eta(self):
+        """Expected seconds until the whole sweep is done, or None if unknown"""
+        with self.lock:
+            correction = self.actual / self.predicted if self.predicted else 1.0
+            now = time.time()
+
+            remaining = []
+            for idx, started in self.started.items():
+                expected = self._expected(idx)
+                if expected is None:
+                    return None
+                remaining.append(max(expected * correction - (now - started), 0.0))
+
+            pending = []
+            for idx in sorted(self.configs):
+                if idx in self.finished or idx in self.started:
+                    continue
+                expected = self._expected(idx)
+                if expected is None:
+                    return None
+                pending.append(expected * correction)
+
+            return schedule_eta(remaining, pending, self.workers)
+
+    def status(self):
+        """One-line progress and ETA"""
+        done = len(self.finished)
+        eta = self.eta()
+        text = f"{done}/{len(self.configs)} done, {len(self.started)} running"
+        if eta is None:
+            return text + ", ETA unknown"
+        return text + f", ETA {eta/60:.1f} min (finish ~{time.strftime('%H:%M', time.localtime(time.time() + eta))})"
+
+def main():
+    """Predict the manifest's sweep time and report the model's accuracy"""
+
+    parser = argparse.ArgumentParser(description="Predict experiment durations")
+    parser.add_argument("--workers", type=int, default=1, help="experiments run concurrently")
+    args = parser.parse_args()
+
+    configs, durations = load_finished_runs()
+    if not durations:
+        print("No finished runs to fit on. Run analyze_results.py first.")
+        return
+
+    # Leave-one-out error
+    errors = []
+    for i in range(len(configs)):
+        model = DurationModel().fit(configs[:i] + configs[i + 1:], durations[:i] + durations[i + 1:])
+        errors.append(model.predict(configs[i]) - durations[i])
+    errors = np.array(errors)
+    actual = np.array(durations)
+
+    model = DurationModel().fit(configs, durations)
+
+    print(f"\n{'#'*60}")
+    print("# nanoGPT Duration Model")
+    print(f"# Fit on {len(durations)} finished runs")
+    print(f"# Leave-one-out MAE: {np.abs(errors).mean():.2f} s "
+          f"({np.abs(errors / actual).mean()*100:.1f}% of run time)")
+    print(f"{'#'*60}\n")
+
+    if model.coef is not None:
+        for name, coef in zip(FEATURES, model.coef):
+            print(f"  {name:<14} {coef:+.4f}")
+
+    from experiment_manifest import load_experiments
+
+    try:
+        experiments = load_experiments()
+    except FileNotFoundError:
+        return
+
+    predicted = [model.predict(exp['config']) for exp in experiments]
+    total = schedule_eta([], predicted, max(1, args.workers))
+    print(f"\nPredicted sweep time for {len(experiments)} experiments on {args.workers} worker(s): "
+          f"{total/60:.1f} minutes (sum of runs {sum(predicted)/60:.1f} minutes)")
+
+if __name__ == "__main__":
+    main()
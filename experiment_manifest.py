@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Compact SQLite manifest of generated experiments
+
+The base configuration is stored once and every experiment only keeps the
+keys that differ from it. Each sweep axis also gets its own indexed column,
+so runners and analysis scripts can look up one experiment or filter by
+member/axis without loading the whole sweep. The per-experiment out_dir is
+a column of its own, so the remaining deltas repeat across the sweep and
+each distinct one is decoded only once when loading.
+
+Writing upserts by (member, exp_name): regenerating a sweep keeps the rows
+of experiments that were skipped because they had already been run.
+
+Usage:
+    python experiment_manifest.py convert            # experiment_summary.json -> manifest
+    python experiment_manifest.py show <exp_name>
+    python experiment_manifest.py list [member] [axis=value ...]
+"""
+import json
+import os
+import sqlite3
+import sys
+
+from config_fingerprint import config_fingerprint
+
+MANIFEST_FILE = 'experiments/experiment_manifest.sqlite'
+SUMMARY_FILE = 'experiments/experiment_summary.json'
+
+# Sweep axes stored as indexed columns
+AXES = ['block_size', 'n_layer', 'n_head', 'n_embd', 'batch_size', 'max_iters', 'dropout']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS base_configs (
+    id INTEGER PRIMARY KEY,
+    config TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS experiments (
+    id INTEGER PRIMARY KEY,
+    exp_name TEXT NOT NULL,
+    member TEXT NOT NULL,
+    config_path TEXT NOT NULL,
+    base_id INTEGER NOT NULL REFERENCES base_configs(id),
+    delta TEXT NOT NULL,
+    out_dir TEXT,
+    fingerprint TEXT,
+    block_size INTEGER,
+    n_layer INTEGER,
+    n_head INTEGER,
+    n_embd INTEGER,
+    batch_size INTEGER,
+    max_iters INTEGER,
+    dropout REAL,
+    UNIQUE (member, exp_name)
+);
+CREATE INDEX IF NOT EXISTS idx_experiments_exp_name ON experiments (exp_name);
+CREATE INDEX IF NOT EXISTS idx_experiments_member ON experiments (member);
+CREATE INDEX IF NOT EXISTS idx_experiments_fingerprint ON experiments (fingerprint);
+""" + "".join(
+    f"CREATE INDEX IF NOT EXISTS idx_experiments_{axis} ON experiments ({axis});\n"
+    for axis in AXES
+)
+
+# Bumped when SCHEMA or the migrations in connect() change
+SCHEMA_VERSION = 1
+
+def connect(path=MANIFEST_FILE):
+    """Open (and create if needed) a manifest database
+
+    The schema is created (and older manifests migrated) only when the
+    database's user_version is behind SCHEMA_VERSION, so later opens cost a
+    single PRAGMA read.
+    """
+    conn = sqlite3.connect(path)
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return conn
+
+    conn.executescript(SCHEMA)
+
+    # Manifests written before out_dir had its own column keep it in the delta
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(experiments)")}
+    if 'out_dir' not in columns:
+        conn.execute("ALTER TABLE experiments ADD COLUMN out_dir TEXT")
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    conn.commit()
+    return conn
+
+def _intern_base(conn, base_config, cache):
+    """Return the id of a base config, inserting it once"""
+    key = json.dumps(base_config)
+    if key not in cache:
+        conn.execute("INSERT OR IGNORE INTO base_configs (config) VALUES (?)", (key,))
+        row = conn.execute("SELECT id FROM base_configs WHERE config = ?", (key,)).fetchone()
+        cache[key] = row[0]
+    return cache[key]
+
+def write_manifest(experiments, base_config, path=MANIFEST_FILE, append=False, keep=()):
+    """Write experiments (as built by generate_experiments) to the manifest
+
+    Experiments already in the manifest are updated in place. Unless
+    append=True, rows of other experiments are dropped, except for the
+    (member, exp_name) pairs in keep (e.g. experiments skipped as already run).
+    """
+    conn = connect(path)
+    base_cache = {}
+
+    with conn:
+        for exp in experiments:
+            config = exp["config"]
+            base = {k: v for k, v in base_config.items() if config.get(k) == v}
+            delta = {k: v for k, v in config.items() if k not in base and k != "out_dir"}
+            base_id = _intern_base(conn, base, base_cache)
+
+            conn.execute(
+                f"INSERT INTO experiments (exp_name, member, config_path, base_id, delta, out_dir, fingerprint, "
+                f"{', '.join(AXES)}) VALUES (?, ?, ?, ?, ?, ?, ?, {', '.join('?' * len(AXES))}) "
+                f"ON CONFLICT (member, exp_name) DO UPDATE SET config_path = excluded.config_path, "
+                f"base_id = excluded.base_id, delta = excluded.delta, out_dir = excluded.out_dir, "
+                f"fingerprint = excluded.fingerprint, "
+                f"{', '.join(f'{axis} = excluded.{axis}' for axis in AXES)}",
+                (exp["exp_name"], exp["member"], exp["config_path"], base_id, json.dumps(delta),
+                 config.get("out_dir"), exp.get("fingerprint") or config_fingerprint(config),
+                 *[config.get(axis) for axis in AXES])
+            )
+
+        if not append:
+            current = {(exp["member"], exp["exp_name"]) for exp in experiments} | set(keep)
+            stale = [row for row in conn.execute("SELECT member, exp_name FROM experiments")
+                     if row not in current]
+            conn.executemany("DELETE FROM experiments WHERE member = ? AND exp_name = ?", stale)
+
+    conn.close()
+
+def _row_to_experiment(row, bases, configs=None):
+    """Rebuild the experiment_summary.json entry for a manifest row
+
+    configs memoizes the merged base and delta across rows sharing them.
+    """
+    exp_name, member, config_path, base_id, delta, out_dir = row
+    if configs is None:
+        configs = {}
+    if (base_id, delta) not in configs:
+        merged = dict(bases[base_id])
+        merged.update(json.loads(delta))
+        configs[base_id, delta] = merged
+
+    config = dict(configs[base_id, delta])
+    if out_dir is not None:
+        config["out_dir"] = out_dir
+    return {
+        "member": member,
+        "exp_name": exp_name,
+        "config_path": config_path,
+        "config": config
+    }
+
+def _load_bases(conn):
+    """Load all interned base configs keyed by id"""
+    return {row[0]: json.loads(row[1]) for row in conn.execute("SELECT id, config FROM base_configs")}
+
+def query_experiments(path=MANIFEST_FILE, member=None, **axes):
+    """Return experiments from the manifest, optionally filtered by member and axis values"""
+    for axis in axes:
+        if axis not in AXES:
+            raise ValueError(f"Unknown axis: {axis}")
+
+    clauses, params = [], []
+    if member is not None:
+        clauses.append("member = ?")
+        params.append(member)
+    for axis, value in axes.items():
+        clauses.append(f"{axis} = ?")
+        params.append(value)
+
+    sql = "SELECT exp_name, member, config_path, base_id, delta, out_dir FROM experiments"
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY id"
+
+    conn = connect(path)
+    try:
+        bases = _load_bases(conn)
+        configs = {}
+        return [_row_to_experiment(row, bases, configs) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+def get_experiment(exp_name, member=None, path=MANIFEST_FILE):
+    """Look up a single experiment by name (and member, if names are reused)"""
+    sql = "SELECT exp_name, member, config_path, base_id, delta, out_dir FROM experiments WHERE exp_name = ?"
+    params = [exp_name]
+    if member is not None:
+        sql += " AND member = ?"
+        params.append(member)
+
+    conn = connect(path)
+    try:
+        row = conn.execute(sql, params).fetchone()
+        if row is None:
+            return None
+        base = conn.execute("SELECT config FROM base_configs WHERE id = ?", (row[3],)).fetchone()
+        return _row_to_experiment(row, {row[3]: json.loads(base[0])})
+    finally:
+        conn.close()
+
+def find_by_fingerprints(fingerprints, path=MANIFEST_FILE):
+    """Map each given config fingerprint to its manifest experiments
+
+    All lookups share one connection; fingerprints with no experiments are
+    left out of the result.
+    """
+    fingerprints = list(dict.fromkeys(fingerprints))
+    found = {}
+    conn = connect(path)
+    try:
+        bases = _load_bases(conn)
+        configs = {}
+        # Stay well below SQLite's limit on bound parameters
+        for start in range(0, len(fingerprints), 500):
+            chunk = fingerprints[start:start + 500]
+            rows = conn.execute(
+                "SELECT exp_name, member, config_path, base_id, delta, out_dir, fingerprint FROM experiments "
+                f"WHERE fingerprint IN ({', '.join('?' * len(chunk))}) ORDER BY id", chunk)
+            for row in rows:
+                found.setdefault(row[6], []).append(_row_to_experiment(row[:6], bases, configs))
+        return found
+    finally:
+        conn.close()
+
+def find_by_fingerprint(fingerprint, path=MANIFEST_FILE):
+    """Return all manifest experiments with the given config fingerprint"""
+    return find_by_fingerprints([fingerprint], path).get(fingerprint, [])
+
+def load_experiments(member=None, **axes):
+    """Load experiments from the manifest, falling back to experiment_summary.json"""
+    if os.path.exists(MANIFEST_FILE):
+        return query_experiments(MANIFEST_FILE, member=member, **axes)
+
+    with open(SUMMARY_FILE, 'r') as f:
+        summary = json.load(f)
+
+    experiments = summary["experiments"]
+    if member is not None:
+        experiments = [e for e in experiments if e["member"] == member]
+    for axis, value in axes.items():
+        experiments = [e for e in experiments if e["config"].get(axis) == value]
+    return experiments
+
+def convert_summary(summary_file=SUMMARY_FILE, path=MANIFEST_FILE):
+    """Convert an existing experiment_summary.json into a manifest"""
+    with open(summary_file, 'r') as f:
+        experiments = json.load(f)["experiments"]
+
+    if not experiments:
+        write_manifest([], {}, path)
+        return 0
+
+    # Keys shared by every experiment form the base config
+    base_config = dict(experiments[0]["config"])
+    for exp in experiments[1:]:
+        config = exp["config"]
+        base_config = {k: v for k, v in base_config.items() if config.get(k) == v}
+
+    write_manifest(experiments, base_config, path)
+    return len(experiments)
+
+def _parse_value(value):
+    """Parse a command-line axis value"""
+    try:
+        return int(value)
+    except ValueError:
+        return float(value)
+
+def main():
+    """Command-line interface"""
+    if len(sys.argv) < 2 or sys.argv[1] not in ('convert', 'show', 'list'):
+        print(__doc__.strip())
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == 'convert':
+        count = convert_summary()
+        print(f"Converted {count} experiments to {MANIFEST_FILE}")
+
+    elif command == 'show':
+        if len(sys.argv) != 3:
+            print("Usage: python experiment_manifest.py show <exp_name>")
+            sys.exit(1)
+        exp = get_experiment(sys.argv[2])
+        if exp is None:
+            print(f"Experiment not found: {sys.argv[2]}")
+            sys.exit(1)
+        print(json.dumps(exp, indent=2))
+
+    else:
+        member = None
+        axes = {}
+        for arg in sys.argv[2:]:
+            if '=' in arg:
+                key, value = arg.split('=', 1)
+                axes[key] = _parse_value(value)
+            else:
+                member = arg
+        for exp in load_experiments(member=member, **axes):
+            print(f"{exp['member']}\t{exp['exp_name']}")
+
+if __name__ == "__main__":
+    main()
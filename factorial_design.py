@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Two-level (fractional) factorial designs and effect estimation
+
+Factors are labelled A, B, C, ... in sweep order and coded -1/+1 for their
+low/high level. A 2^(k-p) fraction keeps the runs that satisfy p generator
+equations (e.g. G = ABCDEF); the generators define the alias structure,
+i.e. which effects cannot be told apart in the fraction.
+"""
+import itertools
+import json
+import string
+
+DESIGN_FILE = 'experiments/design.json'
+
+# Standard minimum-aberration generators: factors -> fraction -> generators
+DESIGNS = {
+    5: {
+        2: ['E=ABCD'],          # 2^(5-1) resolution V
+        4: ['D=AB', 'E=AC'],    # 2^(5-2) resolution III
+    },
+    6: {
+        2: ['F=ABCDE'],         # 2^(6-1) resolution VI
+        4: ['E=ABC', 'F=BCD'],  # 2^(6-2) resolution IV
+    },
+    7: {
+        2: ['G=ABCDEF'],                # 2^(7-1) resolution VII
+        4: ['F=ABCD', 'G=ABDE'],        # 2^(7-2) resolution IV
+        8: ['E=ABC', 'F=BCD', 'G=ACD'], # 2^(7-3) resolution IV
+    },
+}
+
+def design_generators(k, fraction):
+    """Return the generators for a 1/fraction design of k factors"""
+    if fraction == 1:
+        return []
+    if k not in DESIGNS or fraction not in DESIGNS[k]:
+        available = sorted(DESIGNS.get(k, {}))
+        raise ValueError(f"No 1/{fraction} design for {k} factors (available: {available})")
+    return DESIGNS[k][fraction]
+
+def _word(generator):
+    """Turn 'G=ABCDEF' into its defining word {A..G}"""
+    letter, product = generator.split('=')
+    return frozenset(letter) | frozenset(product)
+
+def defining_relation(generators):
+    """All words of the defining relation I = ... (products of generator words)"""
+    words = [_word(g) for g in generators]
+    relation = set()
+    for r in range(1, len(words) + 1):
+        for combo in itertools.combinations(words, r):
+            product = frozenset()
+            for word in combo:
+                product = product ^ word
+            relation.add(product)
+    return sorted(relation, key=lambda w: (len(w), sorted(w)))
+
+def resolution(generators):
+    """Design resolution: length of the shortest defining word"""
+    relation = defining_relation(generators)
+    return min(len(w) for w in relation) if relation else None
+
+def in_fraction(coded, generators):
+    """Check whether a run (letter -> -1/+1) belongs to the principal fraction"""
+    for generator in generators:
+        letter, product = generator.split('=')
+        sign = 1
+        for factor in product:
+            sign *= coded[factor]
+        if coded[letter] != sign:
+            return False
+    return True
+
+def code_levels(values, levels):
+    """Map each factor value to -1 (low) or +1 (high)"""
+    return {name: (-1 if values[name] == min(lv) else 1) for name, lv in levels.items()}
+
+def letters(factors):
+    """Map factor name -> design letter"""
+    return dict(zip(factors, string.ascii_uppercase))
+
+def effect_name(word, factors):
+    """Readable name for an effect word, e.g. {B, C} -> 'n_layer:n_head'"""
+    by_letter = dict(zip(string.ascii_uppercase, factors))
+    return ':'.join(by_letter[c] for c in sorted(word))
+
+def alias_structure(factors, generators, max_order=2, max_alias_order=3):
+    """Map each effect up to max_order to the effects it is aliased with"""
+    relation = defining_relation(generators)
+    names = string.ascii_uppercase[:len(factors)]
+
+    aliases = {}
+    for order in range(1, max_order + 1):
+        for combo in itertools.combinations(names, order):
+            effect = frozenset(combo)
+            aliased = sorted((effect ^ word for word in relation if len(effect ^ word) <= max_alias_order),
+                             key=lambda w: (len(w), sorted(w)))
+            aliases[effect_name(effect, factors)] = [effect_name(w, factors) for w in aliased]
+    return aliases
+
+def describe_design(factors, levels, fraction):
+    """Design metadata saved next to a generated sweep"""
+    generators = design_generators(len(factors), fraction)
+    return {
+        "factors": factors,
+        "letters": letters(factors),
+        "levels": levels,
+        "fraction": fraction,
+        "generators": generators,
+        "resolution": resolution(generators),
+        "defining_relation": [''.join(sorted(w)) for w in defining_relation(generators)],
+        "aliases": alias_structure(factors, generators)
+    }
+
+def save_design(design, path=DESIGN_FILE):
+    """Save design metadata"""
+    with open(path, 'w') as f:
+        json.dump(design, f, indent=2)
+
+def load_design(path=DESIGN_FILE):
+    """Load design metadata, or None if the sweep has none"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def estimate_effects(df, factors, response, max_order=2, aliases=None):
+    """Estimate main effects and interactions of a two-level design
+
+    Each factor is coded -1/+1 from the two levels present in df; the effect
+    of a term is mean(response | +1) - mean(response | -1) of its contrast
+    column. Factors that do not take exactly two levels are skipped.
+    """
+    import numpy as np
+
+    data = df.dropna(subset=[response])
+    y = data[response].to_numpy(dtype=float)
+
+    coded = {}
+    for factor in factors:
+        values = data[factor].to_numpy()
+        levels = np.unique(values)
+        if len(levels) == 2:
+            coded[factor] = np.where(values == levels[1], 1.0, -1.0)
+
+    effects = []
+    for order in range(1, max_order + 1):
+        for combo in itertools.combinations(list(coded), order):
+            contrast = np.prod([coded[f] for f in combo], axis=0)
+            high, low = contrast > 0, contrast < 0
+            if not high.any() or not low.any():
+                continue
+            name = ':'.join(combo)
+            effects.append({
+                'effect': name,
+                'order': order,
+                'estimate': y[high].mean() - y[low].mean(),
+                'aliases': ', '.join(a for a in (aliases or {}).get(name, []) if a != name)
+            })
+
+    return effects
+
+def response_tensor(df, factors, response):
+    """Dense N-d array of a response with one axis per factor
+
+    Returns (levels, values, counts): levels maps each factor to its sorted
+    levels, values[i, j, ...] is the mean response of the runs at those
+    level indices (NaN where no run exists) and counts holds runs per cell.
+    """
+    import numpy as np
+
+    data = df.dropna(subset=[response])
+    levels = {f: np.unique(data[f].to_numpy()) for f in factors}
+    index = tuple(np.searchsorted(levels[f], data[f].to_numpy()) for f in factors)
+    shape = tuple(len(levels[f]) for f in factors)
+
+    sums = np.zeros(shape)
+    counts = np.zeros(shape, dtype=int)
+    np.add.at(sums, index, data[response].to_numpy(dtype=float))
+    np.add.at(counts, index, 1)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        values = sums / counts
+    return {f: lv.tolist() for f, lv in levels.items()}, values, counts
+
+def tensor_effects(df, factors, response, max_order=2):
+    """Main effects, two-way interactions and marginal means from the response tensor
+
+    All statistics are masked reductions over the N-d array: a marginal
+    mean averages the observed cells over every other axis, so missing
+    cells (unfinished runs, fractional designs) are simply left out. The
+    effect of a factor is the mean at its highest level minus the mean at
+    its lowest; a two-way interaction is the corner contrast of the 2-D
+    marginal table, (hh - hl - lh + ll) / 2, which equals the usual
+    two-level interaction effect.
+    """
+    import numpy as np
+
+    levels, values, counts = response_tensor(df, factors, response)
+    mask = ~np.isnan(values)
+    filled = np.where(mask, values, 0.0)
+    axes = range(values.ndim)
+
+    def means(keep):
+        other = tuple(a for a in axes if a not in keep)
+        n = mask.sum(axis=other)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return filled.sum(axis=other) / n, n
+
+    effects = []
+    marginals = []
+
+    for i, factor in enumerate(factors):
+        m, n = means((i,))
+        for level, mean, cells in zip(levels[factor], m, n):
+            marginals.append({'response': response, 'factor': factor, 'level': level,
+                              'mean': mean, 'cells': int(cells)})
+        if len(m) > 1:
+            effects.append({'effect': factor, 'order': 1, 'estimate': m[-1] - m[0]})
+
+    if max_order >= 2:
+        for i, j in itertools.combinations(range(len(factors)), 2):
+            if values.shape[i] < 2 or values.shape[j] < 2:
+                continue
+            m, _ = means((i, j))
+            estimate = (m[-1, -1] - m[-1, 0] - m[0, -1] + m[0, 0]) / 2
+            effects.append({'effect': f'{factors[i]}:{factors[j]}', 'order': 2, 'estimate': estimate})
+
+    return {
+        'levels': levels,
+        'shape': list(values.shape),
+        'coverage': float(mask.mean()) if mask.size else 0.0,
+        'effects': effects,
+        'marginal_means': marginals
+    }
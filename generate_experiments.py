@@ -2,11 +2,22 @@
 """
 Generate experiment configurations for nanoGPT assignment
 4 members, 32 experiments each = 128 total experiments
+
+Usage:
+    python generate_experiments.py [--fraction {1,2,4,8}] [--no-dedupe]
+
+--fraction N generates a 1/N fractional factorial (2^(7-p)) over all seven
+axes instead of the full grid; the design and its alias structure are saved
+to experiments/design.json.
 """
+import argparse
 import itertools
-import json
 import os
 
+from config_fingerprint import config_fingerprint, find_prior_runs
+from experiment_manifest import MANIFEST_FILE, write_manifest
+from factorial_design import DESIGN_FILE, code_levels, describe_design, in_fraction, letters, save_design
+
 # Define the hyperparameter space
 # Member 1: block_size=64, n_layer=4
 # Member 2: block_size=64, n_layer=6
@@ -44,10 +55,43 @@ members = [
     {"name": "member4", "block_size": 128, "n_layer": 6},
 ]
 
-def generate_experiments():
-    """Generate all experiment configurations"""
+# Sweep axes in design order (factors A..G)
+factors = ["block_size", "n_layer", "n_head", "n_embd", "batch_size", "max_iters", "dropout"]
+factor_levels = {
+    "block_size": sorted({m["block_size"] for m in members}),
+    "n_layer": sorted({m["n_layer"] for m in members}),
+    "n_head": n_heads,
+    "n_embd": n_embds,
+    "batch_size": batch_sizes,
+    "max_iters": max_iters_options,
+    "dropout": dropouts,
+}
 
+def write_config_file(config_path, exp_config):
+    """Write a nanoGPT config file"""
+    with open(config_path, 'w') as f:
+        f.write("# Experiment configuration\n")
+        for key, value in exp_config.items():
+            if isinstance(value, str):
+                f.write(f'{key} = "{value}"\n')
+            else:
+                f.write(f'{key} = {value}\n')
+
+def generate_experiments(prior_runs=None, generators=None):
+    """Generate all experiment configurations
+
+    Experiments whose resolved config fingerprint matches a completed run in
+    prior_runs (or an earlier experiment of this sweep) are not generated
+    again; they are returned separately with the runs that satisfy them.
+    With design generators, only runs in the principal fraction are kept
+    (numbering still follows the full grid so names stay stable).
+    """
+
+    factor_letters = letters(factors)
     all_experiments = []
+    reused = []
+    seen = {}
+    prior_runs = prior_runs or {}
 
     for member in members:
         member_name = member["name"]
@@ -70,6 +114,15 @@ def generate_experiments():
                 print(f"  Skipping incompatible: n_embd={n_embd}, n_head={n_head}")
                 continue
 
+            # Keep only runs in the fractional design
+            if generators:
+                point = {"block_size": block_size, "n_layer": n_layer, "n_head": n_head,
+                         "n_embd": n_embd, "batch_size": batch_size, "max_iters": max_iters,
+                         "dropout": dropout}
+                coded = {factor_letters[k]: v for k, v in code_levels(point, factor_levels).items()}
+                if not in_fraction(coded, generators):
+                    continue
+
             # Create experiment config
             exp_config = base_config.copy()
             exp_config.update({
@@ -89,44 +142,75 @@ def generate_experiments():
             # Set output directory
             exp_config["out_dir"] = f"experiments/{member_name}/results/{exp_name}"
 
+            # Skip configs that have already been run or generated
+            fingerprint = config_fingerprint(exp_config)
+            if fingerprint in prior_runs or fingerprint in seen:
+                reused.append({
+                    "member": member_name,
+                    "exp_name": exp_name,
+                    "fingerprint": fingerprint,
+                    "satisfied_by": prior_runs.get(fingerprint) or [seen[fingerprint]]
+                })
+                continue
+            seen[fingerprint] = {"member": member_name, "exp_name": exp_name}
+
             # Save config file
             config_dir = f"experiments/{member_name}/configs"
             os.makedirs(config_dir, exist_ok=True)
 
             config_path = f"{config_dir}/{exp_name}.py"
-            with open(config_path, 'w') as f:
-                f.write("# Experiment configuration\n")
-                for key, value in exp_config.items():
-                    if isinstance(value, str):
-                        f.write(f'{key} = "{value}"\n')
-                    else:
-                        f.write(f'{key} = {value}\n')
+            write_config_file(config_path, exp_config)
 
             all_experiments.append({
                 "member": member_name,
                 "exp_name": exp_name,
                 "config_path": config_path,
-                "config": exp_config
+                "config": exp_config,
+                "fingerprint": fingerprint
             })
 
-    return all_experiments
+    return all_experiments, reused
+
+def print_reuse_report(reused):
+    """Print which prior results satisfy experiments of the new sweep"""
+
+    if not reused:
+        return
+
+    print(f"\n{'-'*60}")
+    print(f"Already satisfied by prior results: {len(reused)}")
+    print(f"{'-'*60}")
+    for exp in reused:
+        runs = ', '.join(f"{r['member']}/{r['exp_name']}" for r in exp["satisfied_by"])
+        print(f"  {exp['member']}/{exp['exp_name']} [{exp['fingerprint']}] <- {runs}")
 
 if __name__ == "__main__":
-    experiments = generate_experiments()
+    parser = argparse.ArgumentParser(description="Generate experiment configurations")
+    parser.add_argument("--fraction", type=int, default=1, choices=[1, 2, 4, 8],
+                        help="run a 1/N fractional factorial design")
+    parser.add_argument("--no-dedupe", action="store_true",
+                        help="regenerate experiments even if they have been run before")
+    args = parser.parse_args()
+
+    design = describe_design(factors, factor_levels, args.fraction)
+    if args.fraction > 1:
+        print(f"Fractional factorial 2^({len(factors)}-{len(design['generators'])}), "
+              f"resolution {design['resolution']}: {', '.join(design['generators'])}")
+
+    prior_runs = {} if args.no_dedupe else find_prior_runs()
 
-    # Save experiment summary
-    summary = {
-        "total_experiments": len(experiments),
-        "experiments_per_member": len(experiments) // 4,
-        "experiments": experiments
-    }
+    experiments, reused = generate_experiments(prior_runs, design["generators"])
+    print_reuse_report(reused)
 
-    with open("experiments/experiment_summary.json", 'w') as f:
-        json.dump(summary, f, indent=2)
+    # Save experiment manifest and design; rows of already-run experiments stay
+    write_manifest(experiments, base_config, keep=[(exp["member"], exp["exp_name"]) for exp in reused])
+    save_design(design)
 
     print(f"\n{'='*60}")
     print(f"Total experiments generated: {len(experiments)}")
     print(f"Experiments per member: {len(experiments) // 4}")
+    print(f"Skipped (already run): {len(reused)}")
     print(f"Configuration files saved in experiments/memberX/configs/")
-    print(f"Summary saved in experiments/experiment_summary.json")
+    print(f"Manifest saved in {MANIFEST_FILE}")
+    print(f"Design saved in {DESIGN_FILE}")
     print(f"{'='*60}\n")
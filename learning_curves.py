@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Learning-curve extrapolation from early eval points
+
+Each run's validation curve is fit by an ensemble of saturating curves
+
+    power law:    L(t) = c + a * (t + 1) ** -b
+    exponential:  L(t) = c + a * exp(-b * t)
+
+For every candidate asymptote c on a grid, log(L - c) is linear in the
+other parameters and is solved by least squares. The fits are weighted by
+how well they match the observed points and by how plausible their decay
+rate and asymptote are given the runs that have finished (the
+cross-experiment prior), and the weighted spread of their predictions
+gives the uncertainty.
+
+Usage:
+    python learning_curves.py [--points N] [--horizon STEPS]
+    python learning_curves.py --backtest [--points N]
+
+Without --points every available eval point is used, so in-flight runs are
+forecast from what they have logged so far. --backtest fits finished runs on
+their first N eval points and checks the forecasts against their final loss.
+"""
+import argparse
+import math
+import re
+
+import numpy as np
+
+from curve_store import build_store, open_store
+
+FAMILIES = {
+    'power': np.log1p,
+    'exp': lambda t: t,
+}
+
+# Candidate asymptotes per family, as fractions of the lowest observed loss
+ASYMPTOTE_GRID = np.linspace(0.0, 0.995, 80)
+
+# Residual floor (loss units) for eval noise plus model misspecification, so
+# near-perfect fits to a few points don't take all the weight
+NOISE_FLOOR = 0.05
+
+def fit_family(steps, losses, family, c):
+    """Least-squares (a, b) of one family for a fixed asymptote; None if it doesn't decay"""
+    z = np.log(losses - c)
+    g = FAMILIES[family](steps)
+    design = np.column_stack([np.ones_like(g), -g])
+    (log_a, b), *_ = np.linalg.lstsq(design, z, rcond=None)
+    if b <= 0:
+        return None
+    return math.exp(log_a), b
+
+def predict(fit, steps):
+    """Loss of one fitted curve at the given steps"""
+    g = FAMILIES[fit['family']](np.asarray(steps, dtype=float))
+    return fit['c'] + fit['a'] * np.exp(-fit['b'] * g)
+
+def fit_curve(steps, losses, prior=None):
+    """Weighted ensemble of curve fits to one run's eval points
+
+    prior maps family -> {'b': (mean, std), 'c': (mean, std)}, the decay
+    rate and the asymptote (relative to the first eval loss) of finished
+    runs; without one the fits are weighted by goodness of fit alone.
+    """
+    steps = np.asarray(steps, dtype=float)
+    losses = np.asarray(losses, dtype=float)
+    if len(steps) < 2:
+        return None
+
+    members = []
+    for family in FAMILIES:
+        for c in ASYMPTOTE_GRID * losses.min():
+            params = fit_family(steps, losses, family, c)
+            if params is None:
+                continue
+            fit = {'family': family, 'c': c, 'a': params[0], 'b': params[1]}
+            fit['sse'] = float(((predict(fit, steps) - losses) ** 2).sum())
+            members.append(fit)
+
+    if not members:
+        return None
+
+    # Residual variance of the best fit, floored at the eval noise
+    dof = max(len(steps) - 3, 1)
+    sigma2 = max(min(m['sse'] for m in members) / dof, NOISE_FLOOR ** 2)
+
+    log_weights = np.array([-0.5 * m['sse'] / sigma2 for m in members])
+    if prior:
+        for i, m in enumerate(members):
+            if m['family'] in prior:
+                for value, (mean, std) in ((m['b'], prior[m['family']]['b']),
+                                           (m['c'] / losses[0], prior[m['family']]['c'])):
+                    log_weights[i] += -0.5 * ((value - mean) / std) ** 2
+
+    weights = np.exp(log_weights - log_weights.max())
+    weights /= weights.sum()
+
+    return {'members': members, 'weights': weights, 'sigma2': sigma2, 'points': len(steps)}
+
+def forecast(ensemble, step):
+    """(mean, std) of the ensemble's predicted loss at a step"""
+    preds = np.array([predict(m, [step])[0] for m in ensemble['members']])
+    mean = float((ensemble['weights'] * preds).sum())
+    var = float((ensemble['weights'] * (preds - mean) ** 2).sum()) + ensemble['sigma2']
+    return mean, math.sqrt(var)
+
+def curve_params(steps, losses):
+    """Per-family (decay rate, asymptote relative to the first eval loss) of one finished curve's best fits"""
+    ensemble = fit_curve(steps, losses)
+    if ensemble is None:
+        return {}
+
+    params = {}
+    for family in FAMILIES:
+        fits = [m for m in ensemble['members'] if m['family'] == family]
+        if fits:
+            best = min(fits, key=lambda m: m['sse'])
+            params[family] = (best['b'], best['c'] / losses[0])
+    return params
+
+def combine_prior(all_params):
+    """Per-family (mean, std) of the decay rate and relative asymptote over curve_params results"""
+    prior = {}
+    for family in FAMILIES:
+        values = [params[family] for params in all_params if family in params]
+        if len(values) >= 2:
+            b, c = np.array(values).T
+            prior[family] = {name: (float(np.mean(v)), max(float(np.std(v)), 1e-3))
+                             for name, v in (('b', b), ('c', c))}
+    return prior
+
+def load_curves():
+    """(key, max_iters, eval steps, val losses) for every run in the curve store"""
+    build_store()
+    store = open_store()
+    curves = []
+    for key in store.keys():
+        match = re.search(r'_mi(\d+)', key)
+        if not match:
+            continue
+        data = store.curve(key)
+        curves.append((key, int(match.group(1)), np.asarray(data['step'], dtype=float),
+                       np.asarray(data['val_loss'], dtype=float)))
+    return curves
+
+def main():
+    """Forecast final and longer-horizon validation loss for every run"""
+
+    parser = argparse.ArgumentParser(description="Extrapolate learning curves from early eval points")
+    parser.add_argument("--points", type=int, default=None, help="eval points to fit (default: all)")
+    parser.add_argument("--horizon", type=int, default=None, help="also forecast at this step")
+    parser.add_argument("--backtest", action="store_true", help="check forecasts against finished runs")
+    args = parser.parse_args()
+
+    curves = load_curves()
+
+    # Finished runs (curve reaches max_iters) inform the prior
+    finished = [c for c in curves if len(c[2]) and c[2][-1] >= c[1]]
+    finished_params = [curve_params(steps, losses) for _, _, steps, losses in finished]
+    prior = combine_prior(finished_params)
+
+    print(f"\n{'#'*60}")
+    print("# nanoGPT Learning-Curve Forecasts")
+    print(f"# Runs: {len(curves)} ({len(finished)} finished)")
+    for family, p in prior.items():
+        print(f"# Prior ({family}): decay {p['b'][0]:.4f} +/- {p['b'][1]:.4f}, "
+              f"asymptote {p['c'][0]:.3f} +/- {p['c'][1]:.3f} x first eval loss")
+    print(f"{'#'*60}\n")
+
+    if args.backtest:
+        points = args.points or 3
+        errors, covered = [], 0
+        for i, (key, max_iters, steps, losses) in enumerate(finished):
+            if len(steps) <= points:
+                continue
+            # Leave the run being tested out of its own prior
+            loo_prior = combine_prior(finished_params[:i] + finished_params[i + 1:])
+            ensemble = fit_curve(steps[:points], losses[:points], loo_prior)
+            if ensemble is None:
+                continue
+            mean, std = forecast(ensemble, steps[-1])
+            errors.append(mean - losses[-1])
+            covered += abs(mean - losses[-1]) <= 2 * std
+
+        if not errors:
+            print(f"No finished runs with more than {points} eval points")
+            return
+        errors = np.array(errors)
+        print(f"Backtest on {len(errors)} runs, fit on the first {points} eval points:")
+        print(f"  Mean absolute error: {np.abs(errors).mean():.4f}")
+        print(f"  Mean error (bias):   {errors.mean():+.4f}")
+        print(f"  Within 2 std:        {covered}/{len(errors)}")
+        return
+
+    import pandas as pd
+
+    rows = []
+    for key, max_iters, steps, losses in curves:
+        n = len(steps) if args.points is None else min(args.points, len(steps))
+        ensemble = fit_curve(steps[:n], losses[:n], prior)
+        if ensemble is None:
+            continue
+
+        member, exp_name = key.split('/', 1)
+        final_mean, final_std = forecast(ensemble, max_iters)
+        row = {
+            'member': member,
+            'exp_name': exp_name,
+            'points': n,
+            'last_step': steps[n - 1],
+            'last_val_loss': losses[n - 1],
+            'predicted_final': final_mean,
+            'predicted_final_std': final_std
+        }
+        if args.horizon:
+            row['predicted_horizon'], row['predicted_horizon_std'] = forecast(ensemble, args.horizon)
+        rows.append(row)
+
+    if not rows:
+        print("No runs with eval points to forecast")
+        return
+
+    df = pd.DataFrame(rows).sort_values('predicted_final')
+    print(df.head(15).to_string(index=False, float_format='{:.4f}'.format))
+
+    output_file = 'experiments/learning_curve_forecasts.csv'
+    df.to_csv(output_file, index=False)
+    print(f"\nForecasts saved to: {output_file}")
+
+if __name__ == "__main__":
+    main()
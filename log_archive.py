@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+"""
+Packed, compressed archive of completed experiment logs
+
+Each member's completed logs are appended to logs/archive.pack as one
+independently compressed frame per log (zstd when the zstandard package is
+installed, zlib otherwise), with logs/archive.index.json mapping each
+experiment to its frame offset and length. A log's structured metrics
+side-channel (exp_name.metrics.jsonl) is packed with it as a frame of its
+own. A single log can be read or extracted by decompressing only its own
+frame.
+
+Usage:
+    python log_archive.py pack [member ...]          # pack completed logs, remove originals
+    python log_archive.py list <member>
+    python log_archive.py extract <member> <exp_name> [output_file]
+"""
+import io
+import json
+import os
+import sys
+import zlib
+from collections import namedtuple
+from pathlib import Path
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+ARCHIVE_NAME = 'archive.pack'
+INDEX_NAME = 'archive.index.json'
+
+CHUNK_SIZE = 1 << 20
+
+# Structured side-channel the runner writes next to each log
+METRICS_SUFFIX = '.metrics.jsonl'
+
+class ArchivedLog(namedtuple('ArchivedLog', 'pack_path exp_name offset length codec metrics',
+                             defaults=(None,))):
+    """Reference to one log frame inside an archive (picklable for worker processes)
+
+    metrics is the (offset, length) of the log's packed metrics frame, if any.
+    """
+
+    @property
+    def stem(self):
+        return self.exp_name
+
+    def metrics_log(self):
+        """Reference to the packed metrics frame of this log, or None"""
+        if self.metrics is None:
+            return None
+        offset, length = self.metrics
+        return ArchivedLog(self.pack_path, self.exp_name + METRICS_SUFFIX, offset, length, self.codec)
+
+    def __str__(self):
+        return f"{self.pack_path}#{self.exp_name}"
+
+def _compressor(codec):
+    if codec == 'zstd':
+        return zstandard.ZstdCompressor(level=10).compressobj()
+    return zlib.compressobj(6)
+
+def _decompressor(codec):
+    if codec == 'zstd':
+        if zstandard is None:
+            raise RuntimeError("This archive uses zstd; install the zstandard package to read it")
+        return zstandard.ZstdDecompressor().decompressobj()
+    return zlib.decompressobj()
+
+class _FrameReader(io.RawIOBase):
+    """Streams one decompressed frame, reading compressed bytes in chunks
+
+    Seeking forward decompresses and discards up to the target; seeking
+    backward restarts the frame.
+    """
+
+    def __init__(self, entry):
+        self._entry = entry
+        self._file = open(entry.pack_path, 'rb')
+        self._rewind()
+
+    def _rewind(self):
+        self._file.seek(self._entry.offset)
+        self._remaining = self._entry.length
+        self._decompressor = _decompressor(self._entry.codec)
+        self._buffer = b''
+        self._pos = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._buffer and self._remaining > 0:
+            chunk = self._file.read(min(CHUNK_SIZE, self._remaining))
+            if not chunk:
+                break
+            self._remaining -= len(chunk)
+            self._buffer = self._decompressor.decompress(chunk)
+
+        n = min(len(b), len(self._buffer))
+        b[:n] = self._buffer[:n]
+        self._buffer = self._buffer[n:]
+        self._pos += n
+        return n
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._pos
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation("archived logs can only seek from the start or current position")
+
+        if offset < self._pos:
+            self._rewind()
+        skip = bytearray(min(CHUNK_SIZE, max(0, offset - self._pos)))
+        while self._pos < offset:
+            if not self.readinto(memoryview(skip)[:offset - self._pos]):
+                break
+        return self._pos
+
+    def close(self):
+        self._file.close()
+        super().close()
+
+def load_index(log_dir):
+    """Archive index for a log directory (no entries if nothing has been packed)"""
+    index_path = Path(log_dir) / INDEX_NAME
+    if not index_path.exists():
+        return {'codec': None, 'entries': {}}
+    with open(index_path, 'r') as f:
+        return json.load(f)
+
+def archived_logs(log_dir):
+    """ArchivedLog references for every log in a directory's archive"""
+    index = load_index(log_dir)
+    pack_path = str(Path(log_dir) / ARCHIVE_NAME)
+    return {
+        name: ArchivedLog(pack_path, name, e['offset'], e['length'], index['codec'],
+                          (e['metrics']['offset'], e['metrics']['length']) if 'metrics' in e else None)
+        for name, e in index['entries'].items()
+    }
+
+def list_logs(log_dir):
+    """All logs of a directory sorted by name: loose .log files, then archived ones
+
+    A loose log takes precedence over an archived copy of the same name.
+    """
+    logs = {p.stem: p for p in Path(log_dir).glob('*.log')}
+    for name, entry in archived_logs(log_dir).items():
+        logs.setdefault(name, entry)
+    return [logs[name] for name in sorted(logs)]
+
+def open_log(source):
+    """Open a loose or archived log for binary reading"""
+    if isinstance(source, ArchivedLog):
+        return io.BufferedReader(_FrameReader(source), buffer_size=CHUNK_SIZE)
+    return open(source, 'rb')
+
+def log_completed(log_file):
+    """Check whether a log ends with the runner's Duration line"""
+    with open(log_file, 'rb') as f:
+        f.seek(0, os.SEEK_END)
+        f.seek(max(0, f.tell() - 256))
+        return b'Duration:' in f.read()
+
+def _pack_frame(pack, path, codec):
+    """Append one file to the pack as a compressed frame; return its index entry"""
+    offset = pack.tell()
+    compressor = _compressor(codec)
+    size = 0
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            pack.write(compressor.compress(chunk))
+    pack.write(compressor.flush())
+    return {'offset': offset, 'length': pack.tell() - offset, 'size': size}
+
+def pack_logs(log_dir, remove=True):
+    """Append completed loose logs (and their metrics files) to the directory's archive; return count packed"""
+    log_dir = Path(log_dir)
+    index = load_index(log_dir)
+    codec = index['codec'] or ('zstd' if zstandard is not None else 'zlib')
+    index['codec'] = codec
+
+    pack_path = log_dir / ARCHIVE_NAME
+    packed = []
+    removable = []
+
+    with open(pack_path, 'ab') as pack:
+        for log_file in sorted(log_dir.glob('*.log')):
+            if not log_completed(log_file):
+                continue
+
+            entry = _pack_frame(pack, log_file, codec)
+            entry['mtime'] = log_file.stat().st_mtime
+            metrics_file = log_file.with_name(log_file.stem + METRICS_SUFFIX)
+            if metrics_file.exists():
+                entry['metrics'] = _pack_frame(pack, metrics_file, codec)
+                removable.append(metrics_file)
+
+            index['entries'][log_file.stem] = entry
+            packed.append(log_file)
+            removable.append(log_file)
+
+        # Metrics files of logs that were packed without them
+        for metrics_file in sorted(log_dir.glob('*' + METRICS_SUFFIX)):
+            stem = metrics_file.name[:-len(METRICS_SUFFIX)]
+            entry = index['entries'].get(stem)
+            if entry is None or 'metrics' in entry or (log_dir / f'{stem}.log').exists():
+                continue
+            entry['metrics'] = _pack_frame(pack, metrics_file, codec)
+            removable.append(metrics_file)
+
+        pack.flush()
+        os.fsync(pack.fileno())
+
+    # Index is written before originals are removed, so a crash never loses a log
+    tmp_path = log_dir / (INDEX_NAME + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f, indent=1)
+    os.replace(tmp_path, log_dir / INDEX_NAME)
+
+    if remove:
+        for path in removable:
+            path.unlink()
+
+    return len(packed)
+
+def extract_log(log_dir, exp_name, output):
+    """Write one archived log to a binary file object"""
+    entry = archived_logs(log_dir).get(exp_name)
+    if entry is None:
+        raise KeyError(f"{exp_name} is not in the archive of {log_dir}")
+    with open_log(entry) as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            output.write(chunk)
+
+def main():
+    """Command-line interface"""
+    if len(sys.argv) < 2 or sys.argv[1] not in ('pack', 'list', 'extract'):
+        print(__doc__.strip())
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == 'pack':
+        members = sys.argv[2:] or sorted(p.parent.name for p in Path('experiments').glob('*/logs'))
+        for member in members:
+            count = pack_logs(f'experiments/{member}/logs')
+            print(f"{member}: packed {count} logs")
+
+    elif command == 'list':
+        if len(sys.argv) != 3:
+            print("Usage: python log_archive.py list <member>")
+            sys.exit(1)
+        index = load_index(f'experiments/{sys.argv[2]}/logs')
+        for name, e in sorted(index['entries'].items()):
+            print(f"{name}\t{e['size']} -> {e['length']} bytes")
+
+    else:
+        if len(sys.argv) not in (4, 5):
+            print("Usage: python log_archive.py extract <member> <exp_name> [output_file]")
+            sys.exit(1)
+        log_dir = f'experiments/{sys.argv[2]}/logs'
+        if len(sys.argv) == 5:
+            with open(sys.argv[4], 'wb') as out:
+                extract_log(log_dir, sys.argv[3], out)
+        else:
+            extract_log(log_dir, sys.argv[3], sys.stdout.buffer)
+
+if __name__ == "__main__":
+    main()
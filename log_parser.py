@@ -0,0 +1,275 @@
+"""
+Single-pass streaming parser for nanoGPT experiment logs
+
+Logs are read one line at a time and every metric is extracted in the same
+pass: the parameter count, per-iteration loss/time/MFU, eval steps,
+checkpoint saves and the runner's Duration and CPU time lines. Memory use
+is independent of log size apart from the extracted per-iteration values.
+
+The runner also writes a structured side-channel next to each text log
+(exp_name.metrics.jsonl, one JSON record per recognized line). When it
+exists it is read instead of the text log; both formats go through the
+same record pipeline.
+"""
+import json
+import os
+import re
+from pathlib import Path
+
+from log_archive import METRICS_SUFFIX, ArchivedLog, open_log
+
+# Precompiled patterns, each anchored at the start of a trainer/runner line
+PARAMS_RE = re.compile(r'number of parameters: ([\d.]+)M')
+ITER_RE = re.compile(r'iter (\d+): loss ([\d.]+)(?:, time ([\d.]+)ms)?(?:, mfu (-?[\d.]+)%)?')
+STEP_RE = re.compile(r'step (\d+): train loss ([\d.]+), val loss ([\d.]+)')
+DURATION_RE = re.compile(r'Duration: ([\d.]+) seconds')
+CHECKPOINT_RE = re.compile(r'saving checkpoint to (.+)')
+CPU_RE = re.compile(r'CPU time: ([\d.]+) seconds')
+
+def iter_records(lines):
+    """Yield typed records for the recognized lines of a log
+
+    Records are tuples:
+        ('params', millions)
+        ('iter', iter_num, loss, time_ms, mfu_percent)   # time/mfu may be None
+        ('eval', step, train_loss, val_loss)
+        ('duration', seconds)
+        ('checkpoint', out_dir)                        # saved after the preceding eval
+        ('cpu', seconds)                               # user + system CPU time of the run
+    """
+    for line in lines:
+        # Structured records from the metrics side-channel
+        if line.startswith('{'):
+            record = json_to_record(line)
+            if record is not None:
+                yield record
+
+        # Cheap prefix checks first; most lines are skipped without a regex
+        elif line.startswith('iter '):
+            match = ITER_RE.match(line)
+            if match:
+                time_ms, mfu = match.group(3), match.group(4)
+                yield ('iter', int(match.group(1)), float(match.group(2)),
+                       float(time_ms) if time_ms else None, float(mfu) if mfu else None)
+        elif line.startswith('step '):
+            match = STEP_RE.match(line)
+            if match:
+                yield ('eval', int(match.group(1)), float(match.group(2)), float(match.group(3)))
+        elif line.startswith('number of parameters'):
+            match = PARAMS_RE.match(line)
+            if match:
+                yield ('params', float(match.group(1)))
+        elif line.startswith('Duration:'):
+            match = DURATION_RE.match(line)
+            if match:
+                yield ('duration', float(match.group(1)))
+        elif line.startswith('CPU time:'):
+            match = CPU_RE.match(line)
+            if match:
+                yield ('cpu', float(match.group(1)))
+        elif line.startswith('saving checkpoint'):
+            match = CHECKPOINT_RE.match(line)
+            if match:
+                yield ('checkpoint', match.group(1).rstrip())
+
+def record_to_json(record):
+    """Serialize a record as one metrics.jsonl line"""
+    kind = record[0]
+    if kind == 'iter':
+        data = {'type': 'iter', 'iter': record[1], 'loss': record[2], 'time_ms': record[3], 'mfu': record[4]}
+    elif kind == 'eval':
+        data = {'type': 'eval', 'step': record[1], 'train_loss': record[2], 'val_loss': record[3]}
+    elif kind == 'params':
+        data = {'type': 'params', 'millions': record[1]}
+    elif kind == 'duration':
+        data = {'type': 'duration', 'seconds': record[1]}
+    elif kind == 'checkpoint':
+        data = {'type': 'checkpoint', 'out_dir': record[1]}
+    elif kind == 'cpu':
+        data = {'type': 'cpu', 'seconds': record[1]}
+    else:
+        data = dict(record[1], type=kind)
+    return json.dumps(data) + '\n'
+
+def json_to_record(line):
+    """Parse one metrics.jsonl line back into a record (None if not a metric)"""
+    try:
+        data = json.loads(line)
+    except ValueError:
+        return None
+
+    kind = data.get('type')
+    if kind == 'iter':
+        return ('iter', data['iter'], data['loss'], data['time_ms'], data['mfu'])
+    if kind == 'eval':
+        return ('eval', data['step'], data['train_loss'], data['val_loss'])
+    if kind == 'params':
+        return ('params', data['millions'])
+    if kind == 'duration':
+        return ('duration', data['seconds'])
+    if kind == 'checkpoint':
+        return ('checkpoint', data['out_dir'])
+    if kind == 'cpu':
+        return ('cpu', data['seconds'])
+    return None
+
+def metrics_path(log_file):
+    """Path of the structured metrics file that belongs to a text log"""
+    log_file = Path(log_file)
+    return log_file.with_name(log_file.stem + METRICS_SUFFIX)
+
+def preferred_source(log_file):
+    """The structured metrics file for a log if there is one, else the log itself"""
+    if isinstance(log_file, ArchivedLog):
+        return log_file.metrics_log() or log_file
+    if str(log_file).endswith(METRICS_SUFFIX):
+        return log_file
+    metrics_file = metrics_path(log_file)
+    return metrics_file if metrics_file.exists() else log_file
+
+def source_signature(log_file):
+    """What results parsed from a log were built from; changes when the log does
+
+    Only stats the source, so callers can tell whether anything changed
+    without reading it.
+    """
+    source = preferred_source(log_file)
+    if isinstance(source, ArchivedLog):
+        return ['archive', source.offset, source.length]
+    st = os.stat(source)
+    return [str(source), st.st_size, st.st_mtime]
+
+def new_state():
+    """Empty parser state; plain lists/values so it can be cached as JSON"""
+    return {
+        'num_parameters': None,
+        'iterations': [],
+        'iter_losses': [],
+        'iter_times': [],
+        'mfus': [],
+        'eval_steps': [],
+        'train_losses': [],
+        'val_losses': [],
+        'checkpoint_steps': [],
+        'duration': None,
+        'cpu_seconds': None
+    }
+
+def apply_record(state, record):
+    """Fold one record into the parser state"""
+    kind = record[0]
+
+    if kind == 'iter':
+        _, iter_num, loss, time_ms, mfu = record
+        state['iterations'].append(iter_num)
+        state['iter_losses'].append(loss)
+        state['iter_times'].append(time_ms)
+        state['mfus'].append(mfu)
+    elif kind == 'eval':
+        _, step, train_loss, val_loss = record
+        state['eval_steps'].append(step)
+        state['train_losses'].append(train_loss)
+        state['val_losses'].append(val_loss)
+    elif kind == 'params':
+        # The first occurrence wins
+        if state['num_parameters'] is None:
+            state['num_parameters'] = record[1]
+    elif kind == 'duration':
+        if state['duration'] is None:
+            state['duration'] = record[1]
+    elif kind == 'cpu':
+        if state['cpu_seconds'] is None:
+            state['cpu_seconds'] = record[1]
+    elif kind == 'checkpoint':
+        # nanoGPT saves right after an eval, before that step's iteration runs
+        if state['eval_steps']:
+            state['checkpoint_steps'].append(state['eval_steps'][-1])
+
+def parse_lines(lines, state=None):
+    """Parse an iterable of text lines into (new or given) state"""
+    state = new_state() if state is None else state
+    for record in iter_records(lines):
+        apply_record(state, record)
+    return state
+
+def _complete_lines(f, counter):
+    """Decode complete lines from a binary file, counting consumed bytes"""
+    for raw in f:
+        if not raw.endswith(b'\n'):
+            break
+        counter[0] += len(raw)
+        yield raw.decode('utf-8', errors='replace')
+
+def parse_stream(f, state):
+    """Parse complete lines from a binary file object; return bytes consumed
+
+    A trailing line without a newline may still be being written, so it is
+    left unconsumed for the next pass.
+    """
+    counter = [0]
+    parse_lines(_complete_lines(f, counter), state)
+    return counter[0]
+
+def parse_log(log_file):
+    """Parse a whole log (a path or an archived log reference)"""
+    state = new_state()
+    with open_log(preferred_source(log_file)) as f:
+        consumed = parse_stream(f, state)
+        # Complete logs end with a newline; pick up a final unterminated line too
+        f.seek(consumed)
+        parse_lines([f.read().decode('utf-8', errors='replace')], state)
+    return state
+
+# Summary mode: how much of the head/tail to read before giving up
+SUMMARY_HEAD_BYTES = 64 * 1024
+SUMMARY_TAIL_BLOCK = 8 * 1024
+SUMMARY_TAIL_LIMIT = 1024 * 1024
+
+def summarize_log(log_file):
+    """Parameter count, final eval and duration read from the head and tail of a log
+
+    The head is scanned for the parameter count, then the file is read
+    backwards from EOF in blocks until the last eval line is found (passing
+    the Duration and CPU time lines on the way if the run has finished).
+    Returns a parser state holding only the final eval, or None if the
+    head/tail did not contain what is needed and the caller should fall
+    back to a full parse.
+    """
+    if isinstance(log_file, ArchivedLog):
+        return None
+
+    log_file = preferred_source(log_file)
+    state = new_state()
+
+    with open(log_file, 'rb') as f:
+        head = f.read(SUMMARY_HEAD_BYTES).decode('utf-8', errors='replace')
+        for record in iter_records(head.splitlines()):
+            if record[0] == 'params':
+                apply_record(state, record)
+                break
+        if state['num_parameters'] is None:
+            return None
+
+        pos = f.seek(0, 2)
+        size = pos
+        carry = b''
+
+        while pos > 0 and size - pos < SUMMARY_TAIL_LIMIT:
+            read = min(SUMMARY_TAIL_BLOCK, pos)
+            pos -= read
+            f.seek(pos)
+            lines = (f.read(read) + carry).split(b'\n')
+
+            # The first piece may be the end of a line that starts further back
+            carry = lines.pop(0) if pos > 0 else b''
+
+            for raw in reversed(lines):
+                line = raw.decode('utf-8', errors='replace')
+                for record in iter_records([line]):
+                    if record[0] in ('duration', 'cpu'):
+                        apply_record(state, record)
+                    elif record[0] == 'eval':
+                        apply_record(state, record)
+                        return state
+
+    return None
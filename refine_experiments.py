@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Adaptive grid refinement around the best configurations
+
+Reads the top-k configurations, builds a finer local grid around each one
+(interpolating dropout, learning_rate and batch_size; the model shape and
+max_iters stay fixed), drops points that have already been run, and writes
+the new configs to experiments/refineN/.
+
+Usage:
+    python refine_experiments.py [--top-k 3] [--max-new 24]
+    python refine_experiments.py --run [--rounds 3] [--budget-minutes 30]
+
+With --run each round is trained immediately, results are re-analyzed and
+the next round zooms in (halving the step sizes) around the new best, until
+the rounds or the wall-clock budget run out. Without --run, each invocation
+generates the next round, zooming in by the number of rounds so far.
+"""
+import argparse
+import itertools
+import os
+import time
+
+import pandas as pd
+
+from config_fingerprint import config_fingerprint, find_prior_runs
+from experiment_manifest import MANIFEST_FILE, SUMMARY_FILE, convert_summary, find_by_fingerprints, write_manifest
+from generate_experiments import base_config, write_config_file
+
+BEST_CONFIGS_FILE = 'experiments/best_configurations.csv'
+RESULTS_FILE = 'experiments/analysis_results.csv'
+
+# Axes that stay fixed at the top configuration's value
+FIXED_AXES = ['block_size', 'n_layer', 'n_head', 'n_embd', 'max_iters']
+
+# Axes refined around the top configurations; step halves every round
+REFINE_AXES = {
+    'dropout': {'scale': 'linear', 'step': 0.05, 'min': 0.0, 'max': 0.5},
+    'learning_rate': {'scale': 'log', 'step': 2 ** 0.5, 'min': 1e-5, 'max': 1e-2},
+    'batch_size': {'scale': 'int', 'step': 4, 'min': 1, 'max': 64},
+}
+
+def axis_candidates(axis, value, round_num):
+    """Values of one axis around the current value for a refinement round"""
+    rule = REFINE_AXES[axis]
+    shrink = 2 ** (round_num - 1)
+
+    if rule['scale'] == 'log':
+        factor = rule['step'] ** (1 / shrink)
+        values = [value / factor, value, value * factor]
+        values = [float(f"{v:.3g}") for v in values]
+    elif rule['scale'] == 'int':
+        step = max(1, round(rule['step'] / shrink))
+        values = [int(value) - step, int(value), int(value) + step]
+    else:
+        step = rule['step'] / shrink
+        values = [round(value + d, 4) for d in (-step, 0, step)]
+
+    values = [v for v in values if rule['min'] <= v <= rule['max']]
+    return sorted(set(values))
+
+def local_grid(center, round_num):
+    """Points of the local grid around one configuration, nearest first"""
+    axes = list(REFINE_AXES)
+    candidates = [axis_candidates(axis, center[axis], round_num) for axis in axes]
+
+    points = []
+    for values in itertools.product(*candidates):
+        point = {axis: center[axis] for axis in FIXED_AXES}
+        point.update(zip(axes, values))
+        changed = sum(point[axis] != center[axis] for axis in axes)
+        if changed:
+            points.append((changed, point))
+
+    return [point for _, point in sorted(points, key=lambda item: item[0])]
+
+def load_top_configs(top_k, df=None):
+    """Top-k configurations by validation loss"""
+    if df is None:
+        source = BEST_CONFIGS_FILE if os.path.exists(BEST_CONFIGS_FILE) else RESULTS_FILE
+        df = pd.read_csv(source)
+
+    if 'learning_rate' not in df.columns:
+        df = df.assign(learning_rate=base_config['learning_rate'])
+
+    top = df.dropna(subset=['final_val_loss']).nsmallest(top_k, 'final_val_loss')
+    return [row.to_dict() for _, row in top.iterrows()]
+
+def next_round():
+    """First unused refinement round number (experiments/refineN)"""
+    n = 1
+    while os.path.exists(f"experiments/refine{n}"):
+        n += 1
+    return n
+
+def estimate_duration(point, df):
+    """Expected run time from completed runs with the same shape, or overall mean"""
+    if df is None or df.empty:
+        return None
+
+    same = df
+    for axis in FIXED_AXES:
+        same = same[same[axis] == point[axis]]
+    durations = same['duration'].dropna()
+    if durations.empty:
+        durations = df['duration'].dropna()
+    return durations.mean() if not durations.empty else None
+
+def generate_round(top_configs, round_num, round_name, max_new, budget_seconds=None, df=None):
+    """Write configs for one refinement round and return the new experiments"""
+
+    prior_runs = find_prior_runs()
+    seen = set()
+    experiments = []
+    planned_seconds = 0.0
+
+    config_dir = f"experiments/{round_name}/configs"
+
+    # Take the nearest remaining point of each center in turn, so max_new is
+    # shared between the centers instead of going to the first one
+    grids = [local_grid(center, round_num) for center in top_configs]
+    points = [point for group in itertools.zip_longest(*grids) for point in group if point is not None]
+
+    candidates = []
+    for point in points:
+        exp_config = base_config.copy()
+        exp_config.update({
+            "block_size": int(point["block_size"]),
+            "n_layer": int(point["n_layer"]),
+            "n_head": int(point["n_head"]),
+            "n_embd": int(point["n_embd"]),
+            "batch_size": int(point["batch_size"]),
+            "max_iters": int(point["max_iters"]),
+            "dropout": point["dropout"],
+            "lr_decay_iters": int(point["max_iters"]),
+            "learning_rate": point["learning_rate"],
+            "min_lr": point["learning_rate"] / 10,
+        })
+        candidates.append((exp_config, config_fingerprint(exp_config)))
+
+    # Points already in the manifest, looked up in one query
+    planned = {}
+    if os.path.exists(MANIFEST_FILE):
+        planned = find_by_fingerprints([fingerprint for _, fingerprint in candidates])
+
+    for exp_config, fingerprint in candidates:
+        if len(experiments) >= max_new:
+            break
+
+        # Exclude points that were already run or planned
+        if fingerprint in prior_runs or fingerprint in seen or fingerprint in planned:
+            continue
+
+        # Stay within the remaining wall-clock budget
+        expected = estimate_duration(exp_config, df)
+        if budget_seconds is not None and expected is not None:
+            if planned_seconds + expected > budget_seconds:
+                continue
+            planned_seconds += expected
+
+        seen.add(fingerprint)
+        idx = len(experiments) + 1
+        exp_name = (f"exp_{idx:03d}_bs{exp_config['block_size']}_nl{exp_config['n_layer']}"
+                    f"_nh{exp_config['n_head']}_ne{exp_config['n_embd']}_bsz{exp_config['batch_size']}"
+                    f"_mi{exp_config['max_iters']}_dr{exp_config['dropout']}_lr{exp_config['learning_rate']:g}")
+        exp_config["out_dir"] = f"experiments/{round_name}/results/{exp_name}"
+
+        os.makedirs(config_dir, exist_ok=True)
+        config_path = f"{config_dir}/{exp_name}.py"
+        write_config_file(config_path, exp_config)
+
+        experiments.append({
+            "member": round_name,
+            "exp_name": exp_name,
+            "config_path": config_path,
+            "config": exp_config,
+            "fingerprint": fingerprint
+        })
+
+    return experiments
+
+def run_round(experiments):
+    """Train a round's experiments and return the refreshed results table"""
+    from analyze_results import analyze_experiments, create_summary_table, save_results
+    from run_all_experiments import run_experiment
+
+    for idx, exp in enumerate(experiments, 1):
+        print(f"\nProgress: {idx}/{len(experiments)}")
+        run_experiment(exp["member"], exp["exp_name"], exp["config_path"])
+
+    df = create_summary_table(analyze_experiments())
+    save_results(df)
+    return df
+
+def main():
+    """Generate (and optionally run) refinement rounds"""
+
+    parser = argparse.ArgumentParser(description="Refine the grid around the best configurations")
+    parser.add_argument("--top-k", type=int, default=3, help="configurations to refine around")
+    parser.add_argument("--max-new", type=int, default=24, help="maximum new experiments per round")
+    parser.add_argument("--run", action="store_true", help="train each round and keep refining")
+    parser.add_argument("--rounds", type=int, default=1, help="maximum number of rounds with --run")
+    parser.add_argument("--budget-minutes", type=float, default=None,
+                        help="total wall-clock budget in minutes for all rounds with --run")
+    args = parser.parse_args()
+
+    print(f"\n{'#'*60}")
+    print(f"# nanoGPT Experiments - Grid Refinement")
+    print(f"{'#'*60}\n")
+
+    df = pd.read_csv(RESULTS_FILE) if os.path.exists(RESULTS_FILE) else None
+    budget_seconds = args.budget_minutes * 60 if args.budget_minutes is not None else None
+    start_time = time.time()
+    rounds = args.rounds if args.run else 1
+
+    for _ in range(rounds):
+        remaining = None
+        if budget_seconds is not None:
+            remaining = budget_seconds - (time.time() - start_time)
+            if remaining <= 0:
+                print("Time budget exhausted")
+                break
+
+        top_configs = load_top_configs(args.top_k, df if args.run else None)
+        if not top_configs:
+            print("No results to refine. Run analyze_results.py first.")
+            break
+
+        round_num = next_round()
+        round_name = f"refine{round_num}"
+        experiments = generate_round(top_configs, round_num, round_name, args.max_new, remaining, df)
+
+        print(f"Round {round_num} ({round_name}): {len(experiments)} new experiments around "
+              f"{', '.join(c['exp_name'] for c in top_configs)}")
+        if not experiments:
+            print("Nothing left to refine")
+            break
+
+        # Start from the coarse sweep if it was only recorded in the summary
+        if not os.path.exists(MANIFEST_FILE) and os.path.exists(SUMMARY_FILE):
+            convert_summary()
+        write_manifest(experiments, base_config, append=True)
+
+        if not args.run:
+            print(f"Configuration files saved in experiments/{round_name}/configs/")
+            break
+
+        df = run_round(experiments)
+        best = df.nsmallest(1, 'final_val_loss').iloc[0]
+        print(f"\nBest after round {round_num}: {best['exp_name']} ({best['member']}) "
+              f"val loss {best['final_val_loss']:.4f}")
+
+    print(f"\n{'#'*60}")
+    print(f"# REFINEMENT COMPLETE")
+    print(f"# Total time: {(time.time() - start_time)/60:.2f} minutes")
+    print(f"{'#'*60}\n")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Indexed SQLite store of experiment results
+
+One row per (member, exp_name) with the sweep axes and final metrics as
+indexed columns. Rows are upserted as experiments finish (by the runners)
+and when analyze_results.py runs, so the store is always current without
+rewriting it. Filters, group-bys, top-k and Pareto queries run in SQLite
+and only return the rows asked for.
+
+Usage:
+    python results_store.py import                       # analysis_results.csv -> store
+    python results_store.py top [k] [--per member] [filter ...]
+    python results_store.py group <column> [metric] [filter ...]
+    python results_store.py pareto [cost] [metric] [filter ...]
+
+Filters look like n_layer=6, dropout=0.1 or final_val_loss<2.0.
+"""
+import os
+import re
+import sqlite3
+import sys
+import time
+
+from log_parser import parse_log
+
+RESULTS_DB = 'experiments/results.sqlite'
+RESULTS_CSV = 'experiments/analysis_results.csv'
+
+# Hyperparameter columns
+AXES = ['block_size', 'n_layer', 'n_head', 'n_embd', 'batch_size', 'max_iters', 'dropout', 'learning_rate']
+
+# Metric columns
+METRICS = ['num_parameters', 'final_train_loss', 'final_val_loss', 'duration', 'val_train_gap',
+           'cpu_seconds', 'tokens', 'tokens_per_sec']
+
+# Metric columns added after the first stores were written; older stores get them on open
+ADDED_COLUMNS = {'cpu_seconds': 'REAL', 'tokens': 'INTEGER', 'tokens_per_sec': 'REAL'}
+
+COLUMNS = ['member', 'exp_name', 'exp_num'] + AXES + METRICS + ['status', 'updated_at']
+
+# Costs that validation loss is traded against on the Pareto frontiers
+PARETO_COSTS = ['duration', 'cpu_seconds', 'num_parameters', 'tokens']
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    member TEXT NOT NULL,
+    exp_name TEXT NOT NULL,
+    exp_num INTEGER,
+    block_size INTEGER,
+    n_layer INTEGER,
+    n_head INTEGER,
+    n_embd INTEGER,
+    batch_size INTEGER,
+    max_iters INTEGER,
+    dropout REAL,
+    learning_rate REAL,
+    num_parameters REAL,
+    final_train_loss REAL,
+    final_val_loss REAL,
+    duration REAL,
+    val_train_gap REAL,
+    cpu_seconds REAL,
+    tokens INTEGER,
+    tokens_per_sec REAL,
+    status TEXT,
+    updated_at REAL,
+    PRIMARY KEY (member, exp_name)
+);
+"""
+
+INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_results_member_val ON results (member, final_val_loss);
+""" + "".join(
+    f"CREATE INDEX IF NOT EXISTS idx_results_{column} ON results ({column});\n"
+    for column in AXES + METRICS
+) + "".join(
+    f"CREATE INDEX IF NOT EXISTS idx_results_{cost}_val ON results ({cost}, final_val_loss);\n"
+    for cost in PARETO_COSTS
+)
+
+FILTER_RE = re.compile(r'^(\w+)(<=|>=|!=|=|<|>)(.+)$')
+
+def connect(path=RESULTS_DB):
+    """Open (and create if needed) a results database"""
+    conn = sqlite3.connect(path)
+    conn.executescript(SCHEMA)
+
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(results)")}
+    for column, sql_type in ADDED_COLUMNS.items():
+        if column not in columns:
+            conn.execute(f"ALTER TABLE results ADD COLUMN {column} {sql_type}")
+    conn.executescript(INDEXES)
+
+    conn.row_factory = sqlite3.Row
+    return conn
+
+def upsert_results(rows, path=RESULTS_DB):
+    """Insert or update result rows (dicts keyed by column); return how many
+
+    Columns a row doesn't supply (or supplies as None) keep their stored
+    value, so re-analysis never overwrites a recorded failure status. New
+    rows without a status are recorded as successful.
+    """
+    now = time.time()
+    inserts = ', '.join("COALESCE(:status, 'success')" if c == 'status' else f":{c}" for c in COLUMNS)
+    updates = ', '.join(f"{c} = COALESCE(:{c}, results.{c})"
+                        for c in COLUMNS if c not in ('member', 'exp_name'))
+    sql = (f"INSERT INTO results ({', '.join(COLUMNS)}) VALUES ({inserts}) "
+           f"ON CONFLICT (member, exp_name) DO UPDATE SET {updates}")
+
+    values = []
+    for row in rows:
+        row = dict(row)
+        row.setdefault('updated_at', now)
+        if row.get('val_train_gap') is None and row.get('final_val_loss') is not None \
+                and row.get('final_train_loss') is not None:
+            row['val_train_gap'] = row['final_val_loss'] - row['final_train_loss']
+        values.append({c: _sql_value(row.get(c)) for c in COLUMNS})
+
+    conn = connect(path)
+    try:
+        with conn:
+            conn.executemany(sql, values)
+    finally:
+        conn.close()
+    return len(values)
+
+def _sql_value(value):
+    """Plain Python value for SQLite (numpy scalars, NaN -> NULL)"""
+    if value is None:
+        return None
+    if hasattr(value, 'item'):
+        value = value.item()
+    if isinstance(value, float) and value != value:
+        return None
+    return value
+
+def record_run(member, exp_name, config, log_file, status='success', path=RESULTS_DB):
+    """Upsert the result of one finished run from its config and log"""
+    from analyze_results import steady_state_times
+
+    state = parse_log(log_file)
+    match = re.match(r'exp_(\d+)', exp_name)
+
+    row = {
+        'member': member,
+        'exp_name': exp_name,
+        'exp_num': int(match.group(1)) if match else None,
+        'num_parameters': state['num_parameters'],
+        'final_train_loss': state['train_losses'][-1] if state['train_losses'] else None,
+        'final_val_loss': state['val_losses'][-1] if state['val_losses'] else None,
+        'duration': state['duration'],
+        'cpu_seconds': state['cpu_seconds'],
+        'status': status
+    }
+    row.update({axis: config.get(axis) for axis in AXES})
+
+    # Same definitions as the analysis table
+    tokens_per_iter = (config.get('batch_size') or 0) * (config.get('block_size') or 0)
+    if tokens_per_iter and config.get('max_iters') is not None:
+        row['tokens'] = (config['max_iters'] + 1) * tokens_per_iter
+    times = steady_state_times(state)
+    if tokens_per_iter and times:
+        row['tokens_per_sec'] = tokens_per_iter / (sum(times) / len(times)) * 1000
+
+    upsert_results([row], path)
+
+def _where(filters, not_null=()):
+    """SQL WHERE clause and parameters for (column, op, value) filters"""
+    clauses = [f"{column} IS NOT NULL" for column in not_null]
+    params = []
+    for column, op, value in filters or []:
+        if column not in COLUMNS:
+            raise ValueError(f"Unknown column: {column}")
+        if op not in ('=', '!=', '<', '<=', '>', '>='):
+            raise ValueError(f"Unknown operator: {op}")
+        clauses.append(f"{column} {op} ?")
+        params.append(value)
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+def _check_column(column, allowed=COLUMNS):
+    """Only known column names are ever interpolated into SQL"""
+    if column not in allowed:
+        raise ValueError(f"Unknown column: {column}")
+
+def query(filters=None, order_by='final_val_loss', limit=None, path=RESULTS_DB):
+    """Rows matching the filters as dicts, ordered by one column"""
+    _check_column(order_by)
+    where, params = _where(filters)
+    sql = f"SELECT * FROM results{where} ORDER BY {order_by} IS NULL, {order_by}"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(int(limit))
+
+    conn = connect(path)
+    try:
+        return [dict(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+def top_k(k=10, metric='final_val_loss', per=None, filters=None, path=RESULTS_DB):
+    """Best k rows by a metric (lowest first), overall or per value of a column"""
+    _check_column(metric)
+    where, params = _where(filters, not_null=[metric])
+    if per is None:
+        sql = f"SELECT * FROM results{where} ORDER BY {metric} LIMIT ?"
+    else:
+        _check_column(per)
+        sql = (f"SELECT * FROM (SELECT *, ROW_NUMBER() OVER (PARTITION BY {per} ORDER BY {metric}) AS rank "
+               f"FROM results{where}) WHERE rank <= ? ORDER BY {per}, rank")
+
+    conn = connect(path)
+    try:
+        return [dict(row) for row in conn.execute(sql, params + [int(k)])]
+    finally:
+        conn.close()
+
+def group_by(column, metric='final_val_loss', filters=None, path=RESULTS_DB):
+    """Count/min/mean/max of a metric for each value of a column"""
+    _check_column(column)
+    _check_column(metric, METRICS)
+    where, params = _where(filters)
+    sql = (f"SELECT {column}, COUNT({metric}) AS count, MIN({metric}) AS min, AVG({metric}) AS mean, "
+           f"MAX({metric}) AS max FROM results{where} GROUP BY {column} ORDER BY {column}")
+
+    conn = connect(path)
+    try:
+        return [dict(row) for row in conn.execute(sql, params)]
+    finally:
+        conn.close()
+
+def pareto(cost='duration', metric='final_val_loss', filters=None, path=RESULTS_DB):
+    """Rows not dominated on (cost, metric), both minimized, in order of cost
+
+    Rows are scanned in (cost, metric) order, keeping a row only if its
+    metric beats every cheaper row. For final_val_loss against one of the
+    PARETO_COSTS the order comes from a composite index, so rows stream
+    without a sort; other pairs are sorted by SQLite first.
+    """
+    _check_column(cost, METRICS)
+    _check_column(metric, METRICS)
+    where, params = _where(filters, not_null=[cost, metric])
+    sql = f"SELECT * FROM results{where} ORDER BY {cost}, {metric}"
+
+    frontier = []
+    best = float('inf')
+    conn = connect(path)
+    try:
+        for row in conn.execute(sql, params):
+            if row[metric] < best:
+                best = row[metric]
+                frontier.append(dict(row))
+    finally:
+        conn.close()
+    return frontier
+
+def import_csv(csv_file=RESULTS_CSV, path=RESULTS_DB):
+    """Upsert every row of an analysis_results.csv"""
+    import csv
+
+    with open(csv_file, 'r', newline='') as f:
+        rows = [{k: _parse_value(v) if k not in ('member', 'exp_name') else v for k, v in row.items()}
+                for row in csv.DictReader(f)]
+    return upsert_results(rows, path)
+
+def _parse_value(value):
+    """Parse a CSV or command-line value"""
+    if value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        try:
+            return float(value)
+        except ValueError:
+            return value
+
+def _parse_filters(args):
+    """Split command-line args into filters and remaining positionals"""
+    filters, rest = [], []
+    for arg in args:
+        match = FILTER_RE.match(arg)
+        if match:
+            filters.append((match.group(1), match.group(2), _parse_value(match.group(3))))
+        else:
+            rest.append(arg)
+    return filters, rest
+
+def _print_rows(rows, columns):
+    """Print rows as an aligned table"""
+    if not rows:
+        print("No matching results")
+        return
+    widths = [max(len(c), *(len(_format(r.get(c))) for r in rows)) for c in columns]
+    print("  ".join(c.rjust(w) for c, w in zip(columns, widths)))
+    for row in rows:
+        print("  ".join(_format(row.get(c)).rjust(w) for c, w in zip(columns, widths)))
+
+def _format(value):
+    """Table cell text for a value"""
+    if isinstance(value, float):
+        return f"{value:.4f}"
+    return '-' if value is None else str(value)
+
+def main():
+    """Command-line interface"""
+    if len(sys.argv) < 2 or sys.argv[1] not in ('import', 'top', 'group', 'pareto'):
+        print(__doc__.strip())
+        sys.exit(1)
+
+    command = sys.argv[1]
+
+    if command == 'import':
+        count = import_csv()
+        print(f"Upserted {count} results into {RESULTS_DB}")
+        return
+
+    if not os.path.exists(RESULTS_DB):
+        print("No results store found. Run: python results_store.py import")
+        sys.exit(1)
+
+    args = sys.argv[2:]
+    per = None
+    if '--per' in args:
+        i = args.index('--per')
+        per = args[i + 1]
+        args = args[:i] + args[i + 2:]
+    filters, rest = _parse_filters(args)
+
+    if command == 'top':
+        k = int(rest[0]) if rest else 10
+        rows = top_k(k, per=per, filters=filters)
+        _print_rows(rows, ['member', 'exp_name', 'final_val_loss', 'val_train_gap', 'duration'])
+
+    elif command == 'group':
+        if not rest:
+            print("Usage: python results_store.py group <column> [metric] [filter ...]")
+            sys.exit(1)
+        metric = rest[1] if len(rest) > 1 else 'final_val_loss'
+        _print_rows(group_by(rest[0], metric, filters), [rest[0], 'count', 'min', 'mean', 'max'])
+
+    else:
+        cost = rest[0] if rest else 'duration'
+        metric = rest[1] if len(rest) > 1 else 'final_val_loss'
+        _print_rows(pareto(cost, metric, filters), ['member', 'exp_name', cost, metric])
+
+if __name__ == "__main__":
+    main()
@@ -1,47 +1,89 @@
 #!/usr/bin/env python3
 """
 Run all experiments for all group members
+
+Usage:
+    python run_all_experiments.py [--workers N] [--compile]
+
+--compile runs every experiment with torch.compile enabled. Experiments are
+grouped by compiled graph (model shape, batch shape and dropout rate), each
+group runs back-to-back on one worker, and all workers share a persistent
+inductor cache, so compilation is paid roughly once per group. Compiled logs go to experiments/memberX/logs_compiled/.
 """
+import argparse
 import os
 import json
 import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-def run_experiment(member_name, exp_name, config_path):
+from compare_sweeps import save_environment
+from duration_model import SweepETA
+from experiment_manifest import load_experiments
+from log_parser import iter_records, metrics_path, record_to_json
+from results_store import record_run
+
+COMPILE_CACHE_DIR = "experiments/compile_cache"
+
+# Config keys that determine the compiled graph (dropout is baked into the
+# graph as a constant, so each rate compiles separately)
+SHAPE_KEYS = ["n_layer", "n_head", "n_embd", "block_size", "batch_size", "dropout"]
+
+def run_experiment(member_name, exp_name, config_path, compile=False, env=None):
     """Run a single experiment"""
     print(f"\n{'='*60}")
-    print(f"Running: {member_name} - {exp_name}")
+    print(f"Running: {member_name} - {exp_name}" + (" [compiled]" if compile else ""))
     print(f"{'='*60}")
 
     # Create log directory
-    log_dir = f"experiments/{member_name}/logs"
+    log_dir = f"experiments/{member_name}/{'logs_compiled' if compile else 'logs'}"
     os.makedirs(log_dir, exist_ok=True)
 
     log_file = f"{log_dir}/{exp_name}.log"
 
     # Run training
     cmd = f"cd nanoGPT && python train.py config/train_shakespeare_char.py ../{config_path}"
+    if compile:
+        cmd += " --compile=True"
 
     start_time = time.time()
 
     try:
-        # Run command and capture output
-        with open(log_file, 'w') as f:
+        # Run command and capture output; recognized trainer lines also go
+        # to the structured metrics file as they are produced
+        with open(log_file, 'w', buffering=1) as f, open(metrics_path(log_file), 'w', buffering=1) as mf:
             f.write(f"Experiment: {exp_name}\n")
             f.write(f"Config: {config_path}\n")
             f.write(f"Started: {time.ctime(start_time)}\n")
             f.write("="*60 + "\n\n")
 
-            result = subprocess.run(
+            mf.write(record_to_json(('start', {
+                "exp_name": exp_name,
+                "config_path": config_path,
+                "started": start_time,
+                "compile": compile
+            })))
+
+            process = subprocess.Popen(
                 cmd,
                 shell=True,
                 stdout=subprocess.PIPE,
                 stderr=subprocess.STDOUT,
-                text=True
+                text=True,
+                env=env
             )
 
-            f.write(result.stdout)
+            for line in process.stdout:
+                f.write(line)
+                for record in iter_records([line]):
+                    mf.write(record_to_json(record))
+
+            # wait4 reports the CPU time of the run, including the trainer under the shell
+            _, status, usage = os.wait4(process.pid, 0)
+            returncode = process.returncode = os.waitstatus_to_exitcode(status)
+            cpu_seconds = usage.ru_utime + usage.ru_stime
 
             end_time = time.time()
             duration = end_time - start_time
@@ -49,16 +91,31 @@ def run_experiment(member_name, exp_name, config_path):
             f.write(f"\n{'='*60}\n")
             f.write(f"Completed: {time.ctime(end_time)}\n")
             f.write(f"Duration: {duration:.2f} seconds\n")
+            f.write(f"CPU time: {cpu_seconds:.2f} seconds\n")
 
-        print(f"✓ Completed in {duration:.2f} seconds")
-        print(f"  Log saved to: {log_file}")
+            mf.write(record_to_json(('exit', {"returncode": returncode, "completed": end_time})))
+            mf.write(record_to_json(('duration', round(duration, 2))))
+            mf.write(record_to_json(('cpu', round(cpu_seconds, 2))))
 
-        return {
+        result = {
             "status": "success",
             "duration": duration,
+            "cpu_seconds": cpu_seconds,
+            "returncode": returncode,
             "log_file": log_file
         }
 
+        # A trainer that crashed or exited non-zero did not finish the run
+        if returncode != 0:
+            print(f"✗ Failed with exit code {returncode} after {duration:.2f} seconds")
+            print(f"  Log saved to: {log_file}")
+            result.update({"status": "failed", "error": f"exit code {returncode}"})
+            return result
+
+        print(f"✓ Completed in {duration:.2f} seconds")
+        print(f"  Log saved to: {log_file}")
+        return result
+
     except Exception as e:
         print(f"✗ Failed: {str(e)}")
         return {
@@ -67,43 +124,104 @@ def run_experiment(member_name, exp_name, config_path):
             "log_file": log_file
         }
 
+def compile_env():
+    """Environment that points every worker at one persistent inductor cache"""
+    cache_dir = Path(COMPILE_CACHE_DIR).resolve()
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    env = dict(os.environ)
+    env["TORCHINDUCTOR_CACHE_DIR"] = str(cache_dir)
+    env["TORCHINDUCTOR_FX_GRAPH_CACHE"] = "1"
+    env["TORCHINDUCTOR_AUTOGRAD_CACHE"] = "1"
+    return env
+
+def shape_key(config):
+    """Compiled-graph shape of an experiment"""
+    return tuple(config[key] for key in SHAPE_KEYS)
+
+def schedule_groups(experiments, compile=False):
+    """Split (index, experiment) pairs into groups that each run back-to-back
+
+    Without compile every experiment is its own group. With compile,
+    experiments sharing a compiled graph (SHAPE_KEYS) form one group, so
+    the first job warms the cache for the rest.
+    """
+    indexed = list(enumerate(experiments, 1))
+    if not compile:
+        return [[item] for item in indexed]
+
+    groups = {}
+    for item in indexed:
+        groups.setdefault(shape_key(item[1]["config"]), []).append(item)
+
+    # Largest groups first so they don't end up as the long tail
+    ordered = sorted(groups.values(), key=len, reverse=True)
+    return ordered
+
 def main():
     """Run all experiments"""
 
-    # Load experiment summary
-    with open("experiments/experiment_summary.json", 'r') as f:
-        summary = json.load(f)
+    parser = argparse.ArgumentParser(description="Run all experiments for all group members")
+    parser.add_argument("--workers", type=int, default=1, help="experiments to run concurrently")
+    parser.add_argument("--compile", action="store_true", help="shape-grouped torch.compile mode")
+    args = parser.parse_args()
 
-    experiments = summary["experiments"]
+    # Load experiment manifest
+    experiments = load_experiments()
     total = len(experiments)
 
     print(f"\n{'#'*60}")
     print(f"# nanoGPT Experiments - Group Assignment")
     print(f"# Total experiments: {total}")
     print(f"# Experiments per member: {total // 4}")
+    if args.compile:
+        print(f"# Compile mode: {len(schedule_groups(experiments, compile=True))} distinct graphs")
     print(f"{'#'*60}\n")
 
-    results = []
+    env = compile_env() if args.compile else None
+    groups = schedule_groups(experiments, compile=args.compile)
+
+    # Recorded so compare_sweeps.py can explain speed differences between sweeps
+    save_environment()
+
+    results = {}
+    lock = threading.Lock()
+    eta = SweepETA(experiments, workers=args.workers)
     start_time = time.time()
 
-    for idx, exp in enumerate(experiments, 1):
-        member = exp["member"]
-        exp_name = exp["exp_name"]
-        config_path = exp["config_path"]
+    def run_group(group):
+        for idx, exp in group:
+            member = exp["member"]
+            exp_name = exp["exp_name"]
+            config_path = exp["config_path"]
+
+            eta.start(idx)
+            print(f"\nProgress: {idx}/{total} ({eta.status()})")
 
-        print(f"\nProgress: {idx}/{total}")
+            result = run_experiment(member, exp_name, config_path, compile=args.compile, env=env)
+            result.update({
+                "member": member,
+                "exp_name": exp_name,
+                "config_path": config_path
+            })
 
-        result = run_experiment(member, exp_name, config_path)
-        result.update({
-            "member": member,
-            "exp_name": exp_name,
-            "config_path": config_path
-        })
-        results.append(result)
+            # Save intermediate results
+            with lock:
+                results[idx] = result
+                # Failed runs are recorded too, flagged by their status
+                if not args.compile and os.path.exists(result["log_file"]):
+                    record_run(member, exp_name, exp["config"], result["log_file"], result["status"])
+                with open("experiments/experiment_results.json", 'w') as f:
+                    json.dump([results[i] for i in sorted(results)], f, indent=2)
+                # Only successful runs are duration samples
+                eta.finish(idx, result["duration"] if result["status"] == "success" else None)
 
-        # Save intermediate results
-        with open("experiments/experiment_results.json", 'w') as f:
-            json.dump(results, f, indent=2)
+            print(f"  Sweep: {eta.status()}")
+
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        list(pool.map(run_group, groups))
+
+    results = [results[i] for i in sorted(results)]
 
     end_time = time.time()
     total_duration = end_time - start_time
@@ -115,6 +233,8 @@ def main():
         "end_time": time.ctime(end_time),
         "total_duration_seconds": total_duration,
         "total_duration_hours": total_duration / 3600,
+        "workers": args.workers,
+        "compile": args.compile,
         "results": results
     }
 
@@ -135,5 +255,9 @@ def main():
     print(f"Success: {successes}/{total}")
     print(f"Failed: {failures}/{total}")
 
+    if args.compile:
+        from analyze_results import print_compile_comparison
+        print_compile_comparison()
+
 if __name__ == "__main__":
     main()
@@ -1,77 +1,27 @@
 import os
 import sys
 import json
-import subprocess
 import time
 
-def run_experiment(member_name, exp_name, config_path):
-    """Run a single experiment"""
-    print(f"\n{'='*60}")
-    print(f"Running: {exp_name}")
-    print(f"{'='*60}")
-
-    # Create log directory
-    log_dir = f"experiments/{member_name}/logs"
-    os.makedirs(log_dir, exist_ok=True)
-
-    log_file = f"{log_dir}/{exp_name}.log"
-
-    # Run training
-    cmd = f"cd nanoGPT && python train.py config/train_shakespeare_char.py ../{config_path}"
-
-    start_time = time.time()
-
-    try:
-        # Run command and capture output
-        with open(log_file, 'w') as f:
-            f.write(f"Experiment: {exp_name}\n")
-            f.write(f"Config: {config_path}\n")
-            f.write(f"Started: {time.ctime(start_time)}\n")
-            f.write("="*60 + "\n\n")
-
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True
-            )
-
-            f.write(result.stdout)
-
-            end_time = time.time()
-            duration = end_time - start_time
-
-            f.write(f"\n{'='*60}\n")
-            f.write(f"Completed: {time.ctime(end_time)}\n")
-            f.write(f"Duration: {duration:.2f} seconds\n")
-
-        print(f"✓ Completed in {duration:.2f} seconds")
-        print(f"  Log saved to: {log_file}")
-
-        return {
-            "status": "success",
-            "duration": duration,
-            "log_file": log_file
-        }
-
-    except Exception as e:
-        print(f"✗ Failed: {str(e)}")
-        return {
-            "status": "failed",
-            "error": str(e),
-            "log_file": log_file
-        }
+from compare_sweeps import save_environment
+from duration_model import SweepETA
+from experiment_manifest import load_experiments
+from results_store import record_run
+from run_all_experiments import compile_env, run_experiment, schedule_groups
 
 def main():
     """Run experiments for specified member"""
 
-    if len(sys.argv) != 2:
-        print("Usage: python run_member_experiments.py <member_number>")
+    args = sys.argv[1:]
+    compile = '--compile' in args
+    args = [a for a in args if a != '--compile']
+
+    if len(args) != 1:
+        print("Usage: python run_member_experiments.py <member_number> [--compile]")
         print("Example: python run_member_experiments.py 1")
         sys.exit(1)
 
-    member_num = sys.argv[1]
+    member_num = args[0]
     member_name = f"member{member_num}"
 
     # Check if member exists
@@ -79,12 +29,8 @@ def main():
         print(f"Error: {member_name} not found!")
         sys.exit(1)
 
-    # Load experiment summary
-    with open("experiments/experiment_summary.json", 'r') as f:
-        summary = json.load(f)
-
-    # Filter experiments for this member
-    member_experiments = [e for e in summary["experiments"] if e["member"] == member_name]
+    # Load this member's experiments from the manifest
+    member_experiments = load_experiments(member=member_name)
 
     if not member_experiments:
         print(f"No experiments found for {member_name}")
@@ -92,21 +38,31 @@ def main():
 
     total = len(member_experiments)
 
+    # In compile mode, run experiments sharing a compiled graph back-to-back
+    env = compile_env() if compile else None
+    if compile:
+        member_experiments = [exp for group in schedule_groups(member_experiments, compile=True)
+                              for _, exp in group]
+
     print(f"\n{'#'*60}")
     print(f"# nanoGPT Experiments - {member_name.upper()}")
     print(f"# Total experiments: {total}")
     print(f"{'#'*60}\n")
 
+    save_environment()
+
     results = []
+    eta = SweepETA(member_experiments)
     start_time = time.time()
 
     for idx, exp in enumerate(member_experiments, 1):
         exp_name = exp["exp_name"]
         config_path = exp["config_path"]
 
-        print(f"\nProgress: {idx}/{total}")
+        eta.start(idx)
+        print(f"\nProgress: {idx}/{total} ({eta.status()})")
 
-        result = run_experiment(member_name, exp_name, config_path)
+        result = run_experiment(member_name, exp_name, config_path, compile=compile, env=env)
         result.update({
             "member": member_name,
             "exp_name": exp_name,
@@ -114,6 +70,13 @@ def main():
         })
         results.append(result)
 
+        # Upsert into the results store (compiled runs are kept separately in logs_compiled/);
+        # failed runs are recorded too, flagged by their status
+        if not compile and os.path.exists(result["log_file"]):
+            record_run(member_name, exp_name, exp["config"], result["log_file"], result["status"])
+        # Only successful runs are duration samples
+        eta.finish(idx, result["duration"] if result["status"] == "success" else None)
+
         # Save intermediate results
         with open(f"experiments/{member_name}/results_summary.json", 'w') as f:
             json.dump(results, f, indent=2)
@@ -149,5 +112,9 @@ def main():
     print(f"Success: {successes}/{total}")
     print(f"Failed: {failures}/{total}")
 
+    if compile:
+        from analyze_results import print_compile_comparison
+        print_compile_comparison(members=[member_name])
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,86 @@
+"""
+Tests for parsing logs whose last line has no trailing newline
+
+Usage:
+    python -m pytest -q test_log_parser.py
+"""
+from analyze_results import LogParseCache, parse_log_job
+from log_archive import archived_logs, open_log, pack_logs
+from log_parser import parse_log
+
+LOG = (
+    "number of parameters: 0.80M\n"
+    "iter 0: loss 4.2000, time 120.00ms, mfu -100.00%\n"
+    "step 10: train loss 3.1000, val loss 3.2000\n"
+    "iter 10: loss 3.0000, time 100.00ms, mfu 1.00%\n"
+    "Duration: 7.58 seconds"
+)
+
+def write_log(tmp_path, text):
+    log_file = tmp_path / 'exp_001_bs64_nl4_nh4_ne128_bsz8_mi25_dr0.1.log'
+    log_file.write_text(text)
+    return log_file
+
+def test_parse_log_job_reads_unterminated_tail(tmp_path):
+    log_file = write_log(tmp_path, LOG)
+    _, entry, metrics = parse_log_job({'path': log_file})
+
+    assert metrics['duration'] == 7.58
+    assert metrics['final_val_loss'] == 3.2
+    # The unterminated line is not committed to the cursor
+    assert entry['offset'] == len(LOG) - len("Duration: 7.58 seconds")
+    assert entry['state']['duration'] is None
+
+def test_parse_log_job_resumes_after_tail_is_terminated(tmp_path):
+    log_file = write_log(tmp_path, LOG)
+    _, entry, _ = parse_log_job({'path': log_file})
+
+    with open(log_file, 'a') as f:
+        f.write("\nCPU time: 6.10 seconds\n")
+    job = {'path': log_file, **{k: entry[k] for k in ('inode', 'offset', 'head', 'state')}}
+    _, entry, metrics = parse_log_job(job)
+
+    assert metrics['duration'] == 7.58
+    assert metrics['cpu_seconds'] == 6.1
+    assert entry['offset'] == log_file.stat().st_size
+
+def test_parse_cache_hit_keeps_unterminated_tail(tmp_path):
+    log_file = write_log(tmp_path, LOG)
+    cache_file = str(tmp_path / 'cache.json')
+
+    cache = LogParseCache(cache_file)
+    assert cache.metrics(log_file)['duration'] == 7.58
+    cache.save()
+
+    reloaded = LogParseCache(cache_file)
+    _, job = reloaded.plan(log_file)
+    assert job is None
+    metrics = reloaded.metrics(log_file)
+    assert metrics['duration'] == 7.58
+    assert metrics['final_val_loss'] == 3.2
+
+def test_parse_log_reads_unterminated_tail(tmp_path):
+    state = parse_log(write_log(tmp_path, LOG))
+
+    assert state['duration'] == 7.58
+    assert state['val_losses'] == [3.2]
+
+def test_parse_log_reads_unterminated_tail_of_archived_log(tmp_path):
+    log_file = write_log(tmp_path, LOG)
+    assert pack_logs(tmp_path) == 1
+    archived = archived_logs(tmp_path)[log_file.stem]
+
+    state = parse_log(archived)
+    assert state['duration'] == 7.58
+    assert state['val_losses'] == [3.2]
+
+def test_archived_log_seeks_back_and_forward(tmp_path):
+    log_file = write_log(tmp_path, LOG)
+    pack_logs(tmp_path, remove=False)
+
+    with open_log(archived_logs(tmp_path)[log_file.stem]) as f:
+        assert f.read() == LOG.encode()
+        f.seek(10)
+        assert f.read(5) == LOG.encode()[10:15]
+        f.seek(len(LOG) - 4)
+        assert f.read() == b'onds'
@@ -1,48 +1,131 @@
 #!/usr/bin/env python3
 """
 Visualize experiment results with plots
+
+pandas, matplotlib, seaborn and numpy (with the curve store) are imported
+by the functions that use them, after their early exits, so a run with
+nothing to plot returns without loading them. The curve store is only
+refreshed when a figure drawn from it has to be redrawn.
 """
+import argparse
+import contextlib
+import io
 import json
 import os
-import re
 from pathlib import Path
-import pandas as pd
-import matplotlib
-matplotlib.use('Agg')  # Non-interactive backend
-import matplotlib.pyplot as plt
-import seaborn as sns
-
-def parse_log_file_detailed(log_file):
-    """Extract all iteration data from a log file"""
-    with open(log_file, 'r') as f:
-        content = f.read()
-
-    data = {
-        'iterations': [],
-        'train_losses': [],
-        'val_losses': [],
-    }
-
-    # Extract iter losses
-    iter_matches = re.findall(r'iter (\d+): loss ([\d.]+)', content)
-    for iter_num, loss in iter_matches:
-        data['iterations'].append(int(iter_num))
-        data['train_losses'].append(float(loss))
-
-    # Extract step losses (validation)
-    step_matches = re.findall(r'step (\d+): train loss ([\d.]+), val loss ([\d.]+)', content)
-    val_data = {}
-    for step, train_loss, val_loss in step_matches:
-        val_data[int(step)] = {
-            'train': float(train_loss),
-            'val': float(val_loss)
-        }
-
-    data['val_data'] = val_data
 
-    return data
-
-def plot_loss_curves(member='member1', n_plots=6):
+from analyze_results import PARETO_COSTS, pareto_frontiers
+from log_archive import list_logs
+from log_parser import parse_log, source_signature
+
+# Points kept per curve when drawing; a 15x10in figure at dpi 150 has
+# about 750 pixels across each of its six panels
+MAX_CURVE_POINTS = 1000
+
+# Points per curve in the all-runs overlay, which draws every run at once
+OVERLAY_POINTS = 256
+
+def _pyplot():
+    """matplotlib.pyplot on the non-interactive backend, imported on first use"""
+    import matplotlib
+    matplotlib.use('Agg')  # Non-interactive backend
+    import matplotlib.pyplot as plt
+    return plt
+
+def lttb(x, y, n_out):
+    """Indices of n_out points chosen by largest-triangle-three-buckets
+
+    The first and last points are kept. The rest are split into n_out - 2
+    buckets, and each bucket keeps the point that forms the largest
+    triangle with the point kept before it and the mean of the next bucket.
+    Spikes and the overall shape survive, unlike with strided sampling.
+    """
+    import numpy as np
+
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    every = (n - 2) / (n_out - 2)
+    bounds = (np.arange(n_out - 1) * every).astype(np.int64) + 1
+    bounds[-1] = n - 1
+
+    indices = np.empty(n_out, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = bounds[i], bounds[i + 1]
+        if i + 2 < len(bounds):
+            next_x, next_y = x[hi:bounds[i + 2]].mean(), y[hi:bounds[i + 2]].mean()
+        else:
+            next_x, next_y = x[-1], y[-1]
+
+        # Twice the triangle areas; the constant factor doesn't change the argmax
+        areas = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(areas.argmax())
+        indices[i + 1] = a
+
+    return indices
+
+def minmax_envelope(y, n_out):
+    """Indices of the first, last, and per-bucket min and max points (at most n_out)
+
+    Fully vectorized, so it is much cheaper than LTTB when thousands of
+    curves are reduced at once. Every extreme of the curve is kept.
+    """
+    import numpy as np
+
+    n = len(y)
+    buckets = max((n_out - 2) // 2, 1)
+    size = -(-n // buckets)
+
+    # Pad with the last value so the curve reshapes into equal buckets
+    padded = np.concatenate([y, np.full(buckets * size - n, y[-1])]).reshape(buckets, size)
+    offsets = np.arange(buckets) * size
+    indices = np.concatenate([[0, n - 1], offsets + padded.argmin(axis=1), offsets + padded.argmax(axis=1)])
+    return np.unique(np.minimum(indices, n - 1))
+
+def downsample(x, y, max_points=MAX_CURVE_POINTS, method='lttb'):
+    """A curve reduced to at most max_points points (short curves are returned as-is)
+
+    method is 'lttb' (best shape for a single curve) or 'minmax' (fast, for
+    drawing many curves at once).
+    """
+    if len(x) <= max_points:
+        return x, y
+
+    import numpy as np
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = ~np.isnan(y)
+    x, y = x[keep], y[keep]
+    indices = lttb(x, y, max_points) if method == 'lttb' else minmax_envelope(y, max_points)
+    return x[indices], y[indices]
+
+def load_member_curves(member, n_plots, store=None):
+    """(exp_name, curve) pairs for the first n_plots runs of a member
+
+    Curves are slices of the memory-mapped curve store when it has the
+    member's runs; otherwise the logs are parsed.
+    """
+    if store is not None:
+        keys = store.keys(member)[:n_plots]
+        if keys:
+            return [(store.runs[key]['exp_name'], store.curve(key)) for key in keys]
+
+    curves = []
+    for log_file in list_logs(f'experiments/{member}/logs')[:n_plots]:
+        state = parse_log(log_file)
+        curves.append((log_file.stem, {
+            'iteration': state['iterations'],
+            'loss': state['iter_losses'],
+            'step': state['eval_steps'],
+            'val_loss': state['val_losses']
+        }))
+    return curves
+
+def plot_loss_curves(member='member1', n_plots=6, store=None):
     """Plot loss curves for best experiments"""
 
     log_dir = f'experiments/{member}/logs'
@@ -50,39 +133,35 @@ def plot_loss_curves(member='member1', n_plots=6):
         print(f"No logs found for {member}")
         return
 
-    # Get all log files
-    log_files = sorted(Path(log_dir).glob('*.log'))[:n_plots]
+    # Get curves of the first experiments
+    curves = load_member_curves(member, n_plots, store)
 
-    if not log_files:
+    if not curves:
         print(f"No experiments found for {member}")
         return
 
+    plt = _pyplot()
+
     # Create plot
     fig, axes = plt.subplots(2, 3, figsize=(15, 10))
     fig.suptitle(f'Training Loss Curves - {member.upper()}', fontsize=16)
 
-    for idx, log_file in enumerate(log_files):
+    for idx, (exp_name, curve) in enumerate(curves):
         row = idx // 3
         col = idx % 3
         ax = axes[row, col]
 
-        exp_name = log_file.stem
-
-        # Parse log file
-        data = parse_log_file_detailed(log_file)
-
-        if not data['iterations']:
+        if not len(curve['iteration']):
             continue
 
-        # Plot training loss
-        ax.plot(data['iterations'], data['train_losses'],
+        # Plot training loss (long curves are downsampled to the panel's resolution)
+        iterations, losses = downsample(curve['iteration'], curve['loss'])
+        ax.plot(iterations, losses,
                 label='Train Loss', alpha=0.7, linewidth=1)
 
         # Plot validation loss
-        if data['val_data']:
-            val_iters = sorted(data['val_data'].keys())
-            val_losses = [data['val_data'][i]['val'] for i in val_iters]
-            ax.scatter(val_iters, val_losses, color='red',
+        if len(curve['step']):
+            ax.scatter(curve['step'], curve['val_loss'], color='red',
                       label='Val Loss', s=50, zorder=5)
 
         ax.set_xlabel('Iteration')
@@ -98,6 +177,56 @@ def plot_loss_curves(member='member1', n_plots=6):
     print(f"Loss curves saved to: {output_file}")
     plt.close()
 
+def plot_loss_overlay(max_points=OVERLAY_POINTS):
+    """Overlay every run's training loss curve, colored by final training loss
+
+    All curves go into a single LineCollection. One artist draws much faster
+    than one Line2D per run. Each curve is read from the memory-mapped store
+    and reduced to its min/max envelope before the next one is read, so
+    memory grows with runs * max_points, not with total iterations.
+    """
+    store = _curve_store()
+    if store is None or not len(store):
+        print("No curves found for the overlay")
+        return
+
+    import numpy as np
+
+    segments, finals = [], []
+    for key in store.keys():
+        curve = store.curve(key)
+        if len(curve['iteration']) < 2:
+            continue
+        x, y = downsample(curve['iteration'], curve['loss'], max_points, method='minmax')
+        segments.append(np.column_stack([x, y]))
+        finals.append(y[-1])
+
+    if not segments:
+        print("No curves found for the overlay")
+        return
+
+    plt = _pyplot()
+    from matplotlib.collections import LineCollection
+
+    fig, ax = plt.subplots(figsize=(12, 7))
+    fig.suptitle(f'Training Loss Curves - All Runs ({len(segments)})', fontsize=16)
+
+    lines = LineCollection(segments, array=np.asarray(finals), cmap='viridis_r', linewidths=0.8, alpha=0.6)
+    ax.add_collection(lines)
+    ax.autoscale_view()
+    fig.colorbar(lines, ax=ax, label='Final Train Loss')
+
+    ax.set_xlabel('Iteration')
+    ax.set_ylabel('Loss')
+    ax.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+
+    output_file = 'experiments/loss_curves_overlay.png'
+    plt.savefig(output_file, dpi=150, bbox_inches='tight')
+    print(f"Loss curve overlay saved to: {output_file}")
+    plt.close()
+
 def plot_hyperparameter_comparison():
     """Plot comparison of hyperparameters"""
 
@@ -107,6 +236,10 @@ def plot_hyperparameter_comparison():
         print("No analysis results found. Run analyze_results.py first.")
         return
 
+    import pandas as pd
+    import seaborn as sns
+    plt = _pyplot()
+
     df = pd.read_csv(csv_file)
 
     # Create comparison plots
@@ -171,6 +304,10 @@ def plot_overfitting_analysis():
         print("No analysis results found. Run analyze_results.py first.")
         return
 
+    import pandas as pd
+    import seaborn as sns
+    plt = _pyplot()
+
     df = pd.read_csv(csv_file)
 
     fig, axes = plt.subplots(1, 2, figsize=(15, 6))
@@ -216,6 +353,10 @@ def plot_member_comparison():
         print("No analysis results found. Run analyze_results.py first.")
         return
 
+    import pandas as pd
+    import seaborn as sns
+    plt = _pyplot()
+
     df = pd.read_csv(csv_file)
 
     fig, axes = plt.subplots(1, 2, figsize=(15, 6))
@@ -244,35 +385,250 @@ def plot_member_comparison():
     print(f"Member comparison saved to: {output_file}")
     plt.close()
 
+def plot_pareto_frontiers():
+    """Plot validation loss against each compute cost with its Pareto frontier"""
+
+    # Load results
+    csv_file = 'experiments/analysis_results.csv'
+    if not os.path.exists(csv_file):
+        print("No analysis results found. Run analyze_results.py first.")
+        return
+
+    import pandas as pd
+    plt = _pyplot()
+
+    df = pd.read_csv(csv_file)
+    frontiers = pareto_frontiers(df)
+    if frontiers.empty:
+        return
+
+    labels = {
+        'duration': 'Duration (seconds)',
+        'cpu_seconds': 'CPU Time (seconds)',
+        'num_parameters': 'Parameters (M)',
+        'tokens': 'Training Tokens'
+    }
+
+    fig, axes = plt.subplots(2, 2, figsize=(15, 12))
+    fig.suptitle('Validation Loss vs Compute Cost (Pareto Frontiers)', fontsize=16)
+
+    for ax, cost in zip(axes.flat, PARETO_COSTS):
+        # Results from before a cost was recorded don't have its column
+        if cost not in df:
+            ax.set_visible(False)
+            continue
+
+        data = df.dropna(subset=[cost, 'final_val_loss'])
+        frontier = frontiers[frontiers['cost'] == cost]
+
+        if data.empty:
+            ax.set_visible(False)
+            continue
+
+        ax.scatter(data[cost], data['final_val_loss'], color='gray', alpha=0.5, s=40, label='Experiments')
+        ax.step(frontier['cost_value'], frontier['final_val_loss'], where='post',
+                color='red', linewidth=1.5, label='Pareto frontier')
+        ax.scatter(frontier['cost_value'], frontier['final_val_loss'], color='red', s=60, zorder=5)
+
+        ax.set_xlabel(labels[cost])
+        ax.set_ylabel('Validation Loss')
+        ax.set_title(f'Val Loss vs {labels[cost]}')
+        ax.legend(fontsize=8)
+        ax.grid(True, alpha=0.3)
+
+    plt.tight_layout()
+
+    output_file = 'experiments/pareto_frontiers.png'
+    plt.savefig(output_file, dpi=150, bbox_inches='tight')
+    print(f"Pareto frontiers saved to: {output_file}")
+    plt.close()
+
+def plot_member_loss_curves(member, n_plots):
+    """Loss curves of a member from the shared curve store (render job entry point)"""
+    plot_loss_curves(member, n_plots=n_plots, store=_curve_store())
+
+# Figures main() can render: job name -> (function, analysis_results.csv columns it plots)
+FIGURES = {
+    'loss_curves': (plot_member_loss_curves, None),
+    'loss_overlay': (plot_loss_overlay, None),
+    'hyperparameter_comparison': (plot_hyperparameter_comparison,
+                                  ['block_size', 'n_layer', 'n_head', 'n_embd', 'batch_size', 'dropout',
+                                   'final_val_loss']),
+    'overfitting_analysis': (plot_overfitting_analysis,
+                             ['final_train_loss', 'final_val_loss', 'val_train_gap', 'dropout']),
+    'member_comparison': (plot_member_comparison, ['member', 'final_val_loss', 'duration']),
+    'pareto_frontiers': (plot_pareto_frontiers, ['member', 'exp_name', 'final_val_loss'] + PARETO_COSTS)
+}
+
+RENDER_CACHE_FILE = 'experiments/.render_cache.json'
+
+_store = None
+
+def _curve_store():
+    """The curve store, opened once per process
+
+    Workers map the same column files, so curve data is shared through the
+    page cache instead of being pickled to each process.
+    """
+    from curve_store import open_store
+
+    global _store
+    if _store is None:
+        _store = open_store()
+    return _store
+
+def figure_output(name, args):
+    """PNG file a figure job writes"""
+    if name == 'loss_curves':
+        return f'experiments/{args[0]}/loss_curves.png'
+    if name == 'loss_overlay':
+        return 'experiments/loss_curves_overlay.png'
+    return f'experiments/{name}.png'
+
+def figure_key(name, args, df=None):
+    """Content hash of everything a figure is drawn from
+
+    Covers the plotting code, the job's arguments and the data the figure
+    shows: the source signatures of the logs a loss-curve figure plots
+    (stats only, so the curve store need not be built to check them), or
+    the results columns an aggregate figure reads.
+    """
+    import hashlib
+    import inspect
+
+    func, columns = FIGURES[name]
+    h = hashlib.sha256()
+    h.update(inspect.getsource(func).encode('utf-8'))
+    h.update(json.dumps([name, list(args)]).encode('utf-8'))
+
+    if name in ('loss_curves', 'loss_overlay'):
+        for helper in (plot_loss_curves, downsample, lttb, minmax_envelope):
+            h.update(inspect.getsource(helper).encode('utf-8'))
+        h.update(json.dumps([MAX_CURVE_POINTS, OVERLAY_POINTS]).encode('utf-8'))
+
+        if name == 'loss_curves':
+            logs = list_logs(f'experiments/{args[0]}/logs')[:args[1]]
+        else:
+            logs = [log for log_dir in sorted(Path('experiments').glob('*/logs')) for log in list_logs(log_dir)]
+        for log_file in logs:
+            h.update(json.dumps([log_file.stem, source_signature(log_file)]).encode('utf-8'))
+    else:
+        if name == 'pareto_frontiers':
+            h.update(inspect.getsource(pareto_frontiers).encode('utf-8'))
+        if df is not None:
+            h.update(df[[c for c in columns if c in df]].to_csv(index=False).encode('utf-8'))
+
+    return h.hexdigest()
+
+def load_render_cache(path=RENDER_CACHE_FILE):
+    """Map output file -> key of the inputs it was last rendered from"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_render_cache(cache, path=RENDER_CACHE_FILE):
+    """Write the render cache atomically"""
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def render_figure(job):
+    """Render one (message, figure, args) job; returns what it printed"""
+    message, name, args = job
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        print(message)
+        FIGURES[name][0](*args)
+    return out.getvalue()
+
+def render_figures(jobs, workers=1):
+    """Render independent figures, across a process pool when workers > 1
+
+    Each figure is drawn by one process on the Agg backend, so the PNGs are
+    the same as in serial mode. Output is printed in job order.
+    """
+    if workers > 1 and len(jobs) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            for text in pool.map(render_figure, jobs):
+                print(text, end='')
+    else:
+        for job in jobs:
+            print(render_figure(job), end='')
+
 def main():
     """Main visualization function"""
 
+    parser = argparse.ArgumentParser(description="Plot experiment results")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="figures rendered at once (default: one per core)")
+    parser.add_argument("--force", action="store_true", help="redraw figures whose inputs haven't changed")
+    args = parser.parse_args()
+    workers, force = args.workers, args.force
+
     print("\n" + "#"*80)
     print("# nanoGPT EXPERIMENT VISUALIZATION")
     print("#"*80 + "\n")
 
-    # Plot loss curves for each member
-    for member in ['member1', 'member2', 'member3', 'member4']:
-        print(f"Generating loss curves for {member}...")
-        plot_loss_curves(member, n_plots=6)
+    # Loss curves for each member
+    jobs = [(f"Generating loss curves for {member}...", 'loss_curves', (member, 6))
+            for member in ['member1', 'member2', 'member3', 'member4']]
+    jobs.append(("Generating loss curve overlay...", 'loss_overlay', ()))
 
-    # Plot comparisons (if enough data)
+    # Comparisons (if enough data)
     csv_file = 'experiments/analysis_results.csv'
+    df = None
+    too_few = None
     if os.path.exists(csv_file):
+        import pandas as pd
+
         df = pd.read_csv(csv_file)
 
         if len(df) >= 10:
-            print("\nGenerating hyperparameter comparison plots...")
-            plot_hyperparameter_comparison()
-
-            print("Generating overfitting analysis...")
-            plot_overfitting_analysis()
-
+            jobs.append(("\nGenerating hyperparameter comparison plots...", 'hyperparameter_comparison', ()))
+            jobs.append(("Generating overfitting analysis...", 'overfitting_analysis', ()))
             if len(df['member'].unique()) > 1:
-                print("Generating member comparison...")
-                plot_member_comparison()
+                jobs.append(("Generating member comparison...", 'member_comparison', ()))
+            jobs.append(("Generating Pareto frontiers...", 'pareto_frontiers', ()))
         else:
-            print(f"\nNeed at least 10 experiments for comparison plots (found {len(df)})")
+            too_few = len(df)
+
+    # Skip figures whose inputs hash the same as when their PNG was drawn
+    cache = load_render_cache()
+    keys = {}
+    pending = []
+    for job in jobs:
+        _, name, job_args = job
+        output_file = figure_output(name, job_args)
+        keys[output_file] = figure_key(name, job_args, df)
+        if not force and cache.get(output_file) == keys[output_file] and os.path.exists(output_file):
+            continue
+        pending.append(job)
+
+    if len(pending) < len(jobs):
+        print(f"{len(jobs) - len(pending)} of {len(jobs)} figures unchanged, skipped\n")
+
+    # Bring the curve store up to date (only new or changed logs are parsed)
+    # when a figure drawn from it is stale
+    if any(name in ('loss_curves', 'loss_overlay') for _, name, _ in pending):
+        from curve_store import build_store
+
+        total, parsed = build_store()
+        print(f"Curve store: {total} runs ({parsed} parsed)\n")
+
+    render_figures(pending, workers)
+
+    for _, name, job_args in pending:
+        output_file = figure_output(name, job_args)
+        if os.path.exists(output_file):
+            cache[output_file] = keys[output_file]
+    save_render_cache(cache)
+
+    if too_few is not None:
+        print(f"\nNeed at least 10 experiments for comparison plots (found {too_few})")
 
     print("\n" + "#"*80)
     print("# VISUALIZATION COMPLETE")
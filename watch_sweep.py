@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Live terminal dashboard for a running sweep
+
+Follows every experiment log under experiments/ by polling: each log keeps
+a byte-offset cursor and a small running summary, and a refresh stats the
+logs and parses only the bytes appended since the last one. Log
+directories are only re-listed when their mtime changes, and logs that
+were already finished when first seen are summarized from their head and
+tail. A refresh therefore costs a stat per log plus the newly written
+bytes, whatever the size of the sweep.
+
+Shows the running jobs (iteration, loss, tokens/sec), recently finished
+runs and the current best validation loss.
+
+Usage:
+    python watch_sweep.py [--interval 2] [--recent 8] [--once]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from collections import deque
+from pathlib import Path
+
+from log_parser import new_state, parse_stream, preferred_source, summarize_log
+
+# Steady-state iterations averaged for the live tokens/sec
+RECENT_ITERS = 20
+
+# Iterations skipped as warm-up (as in analyze_results.WARMUP_ITERS)
+WARMUP_ITERS = 5
+
+# A running log not written to for this long is shown as stalled
+STALL_SECONDS = 300
+
+NAME_RE = re.compile(r'_bs(\d+)_.*_bsz(\d+)_mi(\d+)')
+
+def load_configs():
+    """Map (member, exp_name) -> config from the manifest, if there is one"""
+    from experiment_manifest import load_experiments
+
+    try:
+        return {(exp['member'], exp['exp_name']): exp['config'] for exp in load_experiments()}
+    except (FileNotFoundError, OSError, ValueError):
+        return {}
+
+class RunFollower:
+    """Byte-offset cursor and running summary of one experiment log"""
+
+    def __init__(self, member, exp_name, log_file, config=None, compiled=False):
+        self.member = member
+        self.exp_name = exp_name
+        self.log_file = log_file
+        self.compiled = compiled
+        self.source = None
+        self.inode = None
+        self.offset = 0
+
+        config = config or {}
+        match = NAME_RE.search(exp_name)
+        block_size = config.get('block_size', int(match.group(1)) if match else 0)
+        batch_size = config.get('batch_size', int(match.group(2)) if match else 0)
+        self.tokens_per_iter = block_size * batch_size
+        self.max_iters = config.get('max_iters', int(match.group(3)) if match else None)
+
+        self.reset()
+
+    def reset(self):
+        """Forget everything read so far (the log was replaced or truncated)"""
+        self.offset = 0
+        self.iteration = None
+        self.loss = None
+        self.eval = None
+        self.duration = None
+        self.times = deque(maxlen=RECENT_ITERS)
+        self.updated = None
+
+    @property
+    def key(self):
+        # Eager and compiled runs of an experiment are shown as separate rows
+        suffix = ' (compiled)' if self.compiled else ''
+        return f'{self.member}/{self.exp_name}{suffix}'
+
+    @property
+    def finished(self):
+        return self.duration is not None
+
+    def tokens_per_sec(self):
+        """Throughput over the recent steady-state iterations"""
+        if not self.times or not self.tokens_per_iter:
+            return None
+        return self.tokens_per_iter / (sum(self.times) / len(self.times)) * 1000
+
+    def _fold(self, state):
+        """Fold a parser state of newly read lines into the summary"""
+        eval_steps = set(state['eval_steps'])
+        if self.eval is not None:
+            eval_steps.add(self.eval[0])
+        for it, loss, t in zip(state['iterations'], state['iter_losses'], state['iter_times']):
+            self.iteration, self.loss = it, loss
+            # Warm-up iterations and the ones that ran an eval aren't steady state
+            if t is not None and it >= WARMUP_ITERS and it not in eval_steps:
+                self.times.append(t)
+        if state['eval_steps']:
+            self.eval = (state['eval_steps'][-1], state['train_losses'][-1], state['val_losses'][-1])
+        if state['duration'] is not None:
+            self.duration = state['duration']
+
+    def poll(self):
+        """Read whatever was appended since the last poll; return bytes consumed"""
+        # The runner creates the structured metrics file alongside the log
+        source = preferred_source(self.log_file)
+        try:
+            st = os.stat(source)
+        except FileNotFoundError:
+            return 0
+
+        if source != self.source or st.st_ino != self.inode or st.st_size < self.offset:
+            first_sight = self.source is None
+            self.source, self.inode = source, st.st_ino
+            self.reset()
+
+            # Logs that were already complete are summarized from head and tail
+            if first_sight:
+                state = summarize_log(source)
+                if state is not None and state['duration'] is not None:
+                    self._fold(state)
+                    self.offset = st.st_size
+                    self.updated = st.st_mtime
+                    return 0
+
+        if st.st_size == self.offset:
+            return 0
+
+        state = new_state()
+        with open(source, 'rb') as f:
+            f.seek(self.offset)
+            consumed = parse_stream(f, state)
+        self.offset += consumed
+        self.updated = st.st_mtime
+        self._fold(state)
+        return consumed
+
+class SweepWatcher:
+    """Followers for every log under an experiments directory"""
+
+    def __init__(self, root='experiments', configs=None):
+        self.root = Path(root)
+        self.configs = configs or {}
+        self.followers = {}
+        self.dir_mtimes = {}
+        self.bytes_read = 0
+
+    def discover(self):
+        """Start following logs that appeared since the last refresh"""
+        for log_dir in sorted(self.root.glob('*/logs')) + sorted(self.root.glob('*/logs_compiled')):
+            mtime = os.stat(log_dir).st_mtime
+            if self.dir_mtimes.get(log_dir) == mtime:
+                continue
+            self.dir_mtimes[log_dir] = mtime
+
+            member = log_dir.parent.name
+            compiled = log_dir.name == 'logs_compiled'
+            for log_file in log_dir.glob('*.log'):
+                if log_file not in self.followers:
+                    config = self.configs.get((member, log_file.stem))
+                    self.followers[log_file] = RunFollower(member, log_file.stem, log_file, config, compiled)
+
+    def poll(self):
+        """Bring every follower up to date; return bytes read"""
+        self.discover()
+        read = sum(follower.poll() for follower in self.followers.values())
+        self.bytes_read += read
+        return read
+
+    def render(self, recent=8, read=0):
+        """The dashboard as text"""
+        now = time.time()
+        runs = [f for f in self.followers.values() if f.updated is not None]
+        running = sorted((f for f in runs if not f.finished), key=lambda f: f.key)
+        finished = sorted((f for f in runs if f.finished), key=lambda f: f.updated, reverse=True)
+        scored = [f for f in finished if f.eval is not None]
+        width = max([52] + [len(f.key) for f in running + finished[:recent]])
+
+        lines = [
+            '#' * 80,
+            f"# nanoGPT Sweep Watch - {time.strftime('%H:%M:%S')} (read {read / 1024:.1f} KB this refresh)",
+            f"# Logs: {len(runs)} ({len(running)} running, {len(finished)} finished)",
+            '#' * 80,
+            '',
+            'RUNNING:'
+        ]
+
+        if running:
+            lines.append(f"{'experiment':<{width}} {'iter':>9} {'loss':>7} {'val':>7} {'tok/s':>7} {'age':>5}")
+            for f in running:
+                total = f'/{f.max_iters}' if f.max_iters is not None else ''
+                iteration = f'{f.iteration}{total}' if f.iteration is not None else '-'
+                loss = f'{f.loss:.4f}' if f.loss is not None else '-'
+                val = f'{f.eval[2]:.4f}' if f.eval is not None else '-'
+                tps = f.tokens_per_sec()
+                tps = f'{tps:.0f}' if tps is not None else '-'
+                age = now - f.updated
+                status = '  stalled' if age > STALL_SECONDS else ''
+                lines.append(f"{f.key:<{width}} {iteration:>9} {loss:>7} {val:>7} {tps:>7} {age:>4.0f}s{status}")
+        else:
+            lines.append('  (none)')
+
+        lines += ['', 'RECENTLY FINISHED:']
+        if finished:
+            lines.append(f"{'experiment':<{width}} {'val loss':>9} {'duration':>9} {'finished':>9}")
+            for f in finished[:recent]:
+                val = f'{f.eval[2]:.4f}' if f.eval is not None else '-'
+                lines.append(f"{f.key:<{width}} {val:>9} {f.duration:>8.1f}s "
+                             f"{time.strftime('%H:%M:%S', time.localtime(f.updated)):>9}")
+        else:
+            lines.append('  (none)')
+
+        if scored:
+            best = min(scored, key=lambda f: f.eval[2])
+            lines += ['', f"BEST: {best.key} - val loss {best.eval[2]:.4f} (train {best.eval[1]:.4f})"]
+
+        return '\n'.join(lines)
+
+def main():
+    """Follow the sweep's logs and redraw the dashboard until interrupted"""
+
+    parser = argparse.ArgumentParser(description="Live dashboard of a running sweep")
+    parser.add_argument("--interval", type=float, default=2.0, help="seconds between refreshes")
+    parser.add_argument("--recent", type=int, default=8, help="finished runs to show")
+    parser.add_argument("--once", action="store_true", help="render one refresh and exit")
+    parser.add_argument("--root", default="experiments", help="experiments directory")
+    args = parser.parse_args()
+
+    watcher = SweepWatcher(args.root, load_configs())
+    clear = sys.stdout.isatty() and not args.once
+
+    try:
+        while True:
+            read = watcher.poll()
+            frame = watcher.render(args.recent, read)
+            if clear:
+                # Cursor home and clear screen, then draw the frame in one write
+                sys.stdout.write('\033[H\033[2J' + frame + '\n')
+                sys.stdout.flush()
+            else:
+                print(frame + '\n')
+            if args.once:
+                break
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()